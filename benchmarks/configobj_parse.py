@@ -0,0 +1,66 @@
+#!/usr/bin/python
+
+######################################################################
+# header
+
+# Measures how long ConfigObj takes to parse synthetic cross section configs
+# with an increasing number of sections, once with the fast path for the
+# common subset of the syntax and once with the full regex based parser.
+#
+# usage: python configobj_parse.py
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "brot", "lib"))
+from configobj import ConfigObj
+
+
+class FullConfigObj(ConfigObj):
+    """ConfigObj which always uses the full parser."""
+
+    def _fast_parse(self, infile):
+        return False
+
+
+def create_lines(number_of_sections):
+    """Create the lines of a cross section config in the style of cfg/xsv105.cfg,
+    with a nested section and a comment now and then."""
+
+    lines = ["# synthetic cross sections", ""]
+    for i in range(number_of_sections):
+        lines.append("[Sample_{0}_13TeV_pythia8]".format(i))
+        lines.append("\txs =\t\t{0:.6g}".format(1000. / (i + 1)))
+        lines.append("\tweight =\t1.")
+        lines.append("\tNev =\t\t{0}".format(10000 + i))
+        if i % 10 == 0:
+            lines.append("\t# generator settings")
+            lines.append("\t[[generator]]")
+            lines.append("\t\tname = \"pythia8 # tune CUETP8M1\"  # quoted")
+            lines.append("\t\tseed = {0}".format(i))
+        lines.append("")
+
+    return lines
+
+
+def main_benchmark():
+    print "{0:>10} {1:>12} {2:>12} {3:>10}".format("sections", "fast [ms]", "full [ms]", "speedup")
+    for number_of_sections in [1000, 10000, 100000]:
+        lines = create_lines(number_of_sections)
+        if ConfigObj(lines) != FullConfigObj(lines):
+            print "results differ for", number_of_sections, "sections"
+            return 1
+
+        repetitions = max(1, 10000 // number_of_sections)
+        fast = min(timeit.repeat(lambda: ConfigObj(lines),
+                                 number = repetitions, repeat = 3)) / repetitions
+        full = min(timeit.repeat(lambda: FullConfigObj(lines),
+                                 number = repetitions, repeat = 3)) / repetitions
+
+        print "{0:10d} {1:12.1f} {2:12.1f} {3:10.1f}".format(number_of_sections, fast * 1000.,
+                                                              full * 1000., full / fast)
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
@@ -0,0 +1,83 @@
+#!/usr/bin/python
+
+######################################################################
+# header
+
+# Measures how merge_processes() scales with the number of samples, which are
+# merged into a fixed number of labels. For comparison, the previous pairwise
+# label scanning is timed as well, as long as it finishes in reasonable time.
+#
+# usage: python merge_processes.py
+
+import os
+import sys
+import copy
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "brot"))
+import main
+from histogram import Histogram
+
+
+def create_processes(number_of_samples, number_of_labels = 8, number_of_bins = 100):
+    """Create processes with random histograms, distributed over the labels."""
+
+    processes = []
+    for i in range(number_of_samples):
+        contents = np.random.exponential(size = number_of_bins + 2)
+        process = main.Process()
+        process.label = "label" + str(i % number_of_labels)
+        process.hist = Histogram("h1_0_benchmark", np.linspace(0., 1., number_of_bins + 1),
+                                 contents, contents.copy())
+        processes.append(process)
+
+    return processes
+
+
+def merge_pairwise(process_list):
+    """The previous implementation, scanning the remaining processes for the
+    label of the first one and popping the matches from the list."""
+
+    joined_processes = []
+    while process_list:
+        hist = process_list[0].hist.copy()
+        label = process_list[0].label
+
+        j = 1
+        while j < len(process_list):
+            if process_list[j].label == label:
+                hist.add(process_list[j].hist)
+                process_list.pop(j)
+            else:
+                j += 1
+
+        process_copy = copy.copy(process_list[0])
+        process_copy.hist = hist
+        joined_processes.append(process_copy)
+        process_list.pop(0)
+
+    return joined_processes
+
+
+def main_benchmark():
+    print "{0:>10} {1:>16} {2:>16}".format("samples", "grouped [ms]", "pairwise [ms]")
+    for number_of_samples in [10, 100, 1000, 10000]:
+        processes = create_processes(number_of_samples)
+        repetitions = max(1, 1000 // number_of_samples)
+
+        grouped = min(timeit.repeat(lambda: main.merge_processes(list(processes)),
+                                    number = repetitions, repeat = 3)) / repetitions
+        if number_of_samples <= 1000:
+            pairwise = min(timeit.repeat(lambda: merge_pairwise(list(processes)),
+                                         number = repetitions, repeat = 3)) / repetitions
+            pairwise = "{0:16.3f}".format(pairwise * 1000.)
+        else:
+            pairwise = "{0:>16}".format("-")
+
+        print "{0:10d} {1:16.3f} {2}".format(number_of_samples, grouped * 1000., pairwise)
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
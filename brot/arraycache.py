@@ -0,0 +1,153 @@
+import os
+import json
+import hashlib
+import numpy as np
+from lazyroot import ROOT
+
+from histogram import Histogram
+
+
+def convert_file(file_path, sample_dir):
+    """Converts all one dimensional histograms of the ROOT file at file_path
+    into flat arrays of bin contents, squared weights and edges, which are
+    stored in sample_dir together with an index."""
+
+    t_file = ROOT.TFile.Open(file_path)
+    if not t_file or t_file.IsZombie():
+        print "Could not open file", file_path
+        return False
+
+    index = {"mtime" : os.path.getmtime(file_path), "histograms" : {}}
+    contents, sumw2, edges = [], [], []
+    offset, edge_offset = 0, 0
+    for key in t_file.GetListOfKeys():
+        # keys are sorted by cycle, only the highest cycle is used
+        name = key.GetName()
+        if name in index["histograms"]:
+            continue
+
+        t_class = ROOT.TClass.GetClass(key.GetClassName())
+        if not t_class or not t_class.InheritsFrom("TH1"):
+            continue
+
+        histo = key.ReadObj()
+        if histo.GetDimension() == 1:
+            hist = Histogram.from_th1(histo)
+            index["histograms"][name] = {"offset"      : offset,
+                                         "edge_offset" : edge_offset,
+                                         "nbins"       : hist.nbins,
+                                         "title"       : hist.title,
+                                         "xtitle"      : hist.xtitle,
+                                         "ytitle"      : hist.ytitle}
+            contents.append(hist.contents)
+            sumw2.append(hist.sumw2)
+            edges.append(hist.edges)
+            offset += len(hist.contents)
+            edge_offset += len(hist.edges)
+        histo.Delete()
+
+    t_file.Close()
+
+    if not os.path.exists(sample_dir):
+        os.makedirs(sample_dir)
+
+    # files are replaced instead of overwritten, as they might still be mapped
+    for array_name, arrays in [("contents", contents), ("sumw2", sumw2), ("edges", edges)]:
+        path = os.path.join(sample_dir, array_name + ".npy")
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, np.concatenate(arrays) if arrays else np.zeros(0))
+        os.rename(path + ".tmp", path)
+
+    # the index is written last, marking the arrays as complete
+    path = os.path.join(sample_dir, "index.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(index, f)
+    os.rename(path + ".tmp", path)
+    return True
+
+
+def convert_file_job(job):
+    """Unpacks a (file_path, sample_dir) job for the loader pool."""
+
+    return convert_file(*job)
+
+
+class SampleArrays():
+    """Memory mapped arrays of the histograms of one sample."""
+
+    def __init__(self, sample_dir):
+        with open(os.path.join(sample_dir, "index.json"), "r") as f:
+            index = json.load(f)
+
+        self.mtime      = index["mtime"]      # modification time of the converted file
+        self.histograms = index["histograms"] # name : position and titles of the histogram
+        self.contents   = np.load(os.path.join(sample_dir, "contents.npy"), mmap_mode = "r")
+        self.sumw2      = np.load(os.path.join(sample_dir, "sumw2.npy"), mmap_mode = "r")
+        self.edges      = np.load(os.path.join(sample_dir, "edges.npy"), mmap_mode = "r")
+
+
+class ArrayCache():
+    """On-disk cache of the histograms of the analysis files as memory mapped
+    arrays, which are much faster to load than the histograms themselves."""
+
+    def __init__(self, cache_dir = "cache/"):
+        self.cache_dir = cache_dir # directory of the cached arrays
+        self.samples   = {}        # file path : SampleArrays
+
+    def sample_dir(self, file_path):
+        """Returns the directory of the arrays of the ROOT file at file_path,
+        grouped by the directory of the file."""
+
+        directory, file_name = os.path.split(os.path.realpath(file_path))
+        return os.path.join(self.cache_dir, "arrays", hashlib.md5(directory).hexdigest(),
+                            file_name[:-len(".root")])
+
+    def map_sample(self, file_path):
+        """Maps the arrays of the ROOT file at file_path. Returns False, if they
+        are missing or broken, e.g. by a broken index or a short array file."""
+
+        self.samples.pop(file_path, None)
+        try:
+            self.samples[file_path] = SampleArrays(self.sample_dir(file_path))
+        except (IOError, ValueError, KeyError):
+            return False
+        return True
+
+    def is_stale(self, file_path):
+        """Returns whether the ROOT file at file_path has to be converted."""
+
+        mtime = os.path.getmtime(file_path)
+        if file_path in self.samples and self.samples[file_path].mtime == mtime:
+            return False
+
+        return not self.map_sample(file_path) or self.samples[file_path].mtime != mtime
+
+    def update(self, file_paths, map_function = map):
+        """Converts those of the ROOT files which changed since their last
+        conversion, using map_function to distribute them over workers."""
+
+        stale = [file_path for file_path in set(file_paths) if self.is_stale(file_path)]
+        map_function(convert_file_job, [(file_path, self.sample_dir(file_path)) for file_path in stale])
+
+        # map the new arrays
+        for file_path in stale:
+            if not self.map_sample(file_path):
+                print "Could not convert file", file_path
+
+    def get(self, file_path, histogram_name):
+        """Returns the histogram histogram_name of the ROOT file at file_path or
+        None, if the converted file does not contain it."""
+
+        sample = self.samples.get(file_path)
+        if not sample or histogram_name not in sample.histograms:
+            return None
+
+        entry = sample.histograms[histogram_name]
+        nbins, offset, edge_offset = entry["nbins"], entry["offset"], entry["edge_offset"]
+        return Histogram(histogram_name,
+                         np.array(sample.edges[edge_offset : edge_offset + nbins + 1]),
+                         np.array(sample.contents[offset : offset + nbins + 2]),
+                         np.array(sample.sumw2[offset : offset + nbins + 2]),
+                         entry["title"].encode("utf-8"),
+                         entry["xtitle"].encode("utf-8"),
+                         entry["ytitle"].encode("utf-8"))
@@ -0,0 +1,197 @@
+#!/usr/bin/python
+
+######################################################################
+# header
+
+# Plots many histograms without a display, distributed over several worker
+# processes, each of them drawing on its own canvas. The plots are written
+# with the naming scheme of save().
+#
+# usage: python batch.py [-c plot.cfg] [-s selection] [-w workers] [-f pdf,png] [-b book.pdf] [-p pattern] [histogram ...]
+
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+from lazyroot import ROOT
+
+import main
+import style
+from plotbook import PlotBook
+
+
+def init_batch_worker(config_file, analysis_directory):
+    """Sets up bROT in a worker process, drawing in ROOT batch mode."""
+
+    ROOT.gROOT.SetBatch(True)
+    style.set_tdr_style()
+    main.setup(config_file)
+    main.selection(analysis_directory)
+
+    # workers of a pool can not start a pool of their own
+    if main.settings.loader == "process":
+        main.settings.loader = "serial"
+    main.init_loader_process()
+
+
+
+def plot_job(job):
+    """Plots the histogram of a (histogram_name, formats, canvas_file) job and
+    saves it in all formats. If canvas_file is given, the canvas is
+    stored there as well for the plot book. Returns a tuple of
+    (histogram_name, output paths, wall time in s, error message), the error
+    message is empty on success."""
+
+    histogram_name, formats, canvas_file = job
+    start = time.time()
+    try:
+        main.plot(histogram_name)
+        if not main.get_draw_object():
+            return (histogram_name, [], time.time() - start, "nothing to draw")
+        paths = main.save(formats = formats) if formats else []
+        if canvas_file:
+            main.canvas.canvas.SaveAs(canvas_file)
+    except Exception as error:
+        return (histogram_name, [], time.time() - start, repr(error))
+
+    return (histogram_name, paths, time.time() - start, "")
+
+
+
+def add_book_page(book, canvas_file, title):
+    """Appends the canvas stored in canvas_file by plot_job() to the book and
+    removes the file."""
+
+    t_file = ROOT.TFile.Open(canvas_file)
+    if not t_file or t_file.IsZombie():
+        print "Could not open file", canvas_file
+        return
+
+    keys = t_file.GetListOfKeys()
+    stored_canvas = keys.At(0).ReadObj() if keys.GetSize() else None
+    if stored_canvas:
+        stored_canvas.Draw()
+        book.add_page(stored_canvas, title)
+        stored_canvas.Close()
+    t_file.Close()
+    os.remove(canvas_file)
+
+
+
+def batch_histograms(patterns):
+    """Returns the names of all histograms in the catalog matching one of the
+    shell-style patterns, without the histogram prefix."""
+
+    catalog = main.get_catalog()
+    if not catalog:
+        return []
+
+    names = set()
+    for pattern in patterns:
+        names.update(catalog.names(main.settings.hist_prefix + pattern))
+    return [name[len(main.settings.hist_prefix):] for name in sorted(names)]
+
+
+
+def run_batch(histogram_names, config_file = "plot.cfg", analysis_directory = "pytest", workers = 4,
+              formats = ["pdf"], book = None):
+    """Plots all histograms histogram_names using a pool of worker processes
+    and saves every plot in all formats. If a PlotBook is given, the
+    plots are appended to it as pages in the order of histogram_names. Prints
+    the timing of every plot and the overall throughput and returns the list
+    of (histogram_name, paths, wall time, error) results."""
+
+    print "Plotting", len(histogram_names), "histograms with", workers, "workers ..."
+
+    # the workers pass their canvases to the book through files in a directory
+    # of this run, so that several runs do not overwrite each other's pages
+    canvas_dir = None
+    if book:
+        if not os.path.exists(main.settings.cache_dir):
+            os.makedirs(main.settings.cache_dir)
+        canvas_dir = tempfile.mkdtemp(prefix = "book_", dir = main.settings.cache_dir)
+    jobs = [(name, formats, os.path.join(canvas_dir, str(i) + ".root") if book else None)
+            for i, name in enumerate(histogram_names)]
+
+    results = []
+    start = time.time()
+    pool = multiprocessing.Pool(workers, init_batch_worker, (config_file, analysis_directory))
+    try:
+        # pages have to be appended in order, without a book plots are reported as they finish
+        for job, result in zip(jobs, (pool.imap if book else pool.imap_unordered)(plot_job, jobs)):
+            histogram_name, paths, wall_time, error = result
+            if book and not error:
+                add_book_page(book, job[2], histogram_name)
+                paths = paths + [book.file_name]
+            print "{0:40} {1:8.2f} s  {2}".format(histogram_name, wall_time,
+                                                  " ".join(paths) if not error else "failed: " + error)
+            results.append(result)
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        if canvas_dir:
+            shutil.rmtree(canvas_dir, ignore_errors = True)
+    if book:
+        book.close()
+    wall_time = time.time() - start
+
+    # summary
+    succeeded = [result for result in results if not result[3]]
+    plot_time = sum(result[2] for result in results)
+    print "Plotted {0} of {1} histograms in {2:.2f} s ({3:.2f} plots/s, {4:.2f} s per plot)".format(
+        len(succeeded), len(results), wall_time, len(succeeded) / wall_time if wall_time > 0. else 0.,
+        plot_time / len(results) if results else 0.)
+    for histogram_name, paths, plot_wall_time, error in results:
+        if error:
+            print "Failed", histogram_name + ":", error
+
+    return results
+
+
+
+def main_batch():
+    parser = argparse.ArgumentParser(description = "Plot histograms in ROOT batch mode with several workers.")
+    parser.add_argument("histograms", nargs = "*",
+                        help = "names of the histograms, by default all histograms of the catalog")
+    parser.add_argument("-c", "--config", default = "plot.cfg", help = "config file in '../cfg/'")
+    parser.add_argument("-s", "--selection", default = "pytest", help = "analysis sub-directory")
+    parser.add_argument("-w", "--workers", type = int, default = 0,
+                        help = "number of worker processes, by default the number of cores")
+    parser.add_argument("-f", "--formats", default = "pdf",
+                        help = "comma separated formats every plot is saved in, e.g. pdf,png,eps,root")
+    parser.add_argument("-b", "--book", default = "",
+                        help = "append all plots as pages to this multi-page PDF")
+    parser.add_argument("--no-toc", action = "store_true", help = "do not add a table of contents to the book")
+    parser.add_argument("-p", "--pattern", action = "append", default = [],
+                        help = "shell-style pattern of histograms taken from the catalog")
+    args = parser.parse_args()
+
+    ROOT.gROOT.SetBatch(True)
+    main.setup(args.config)
+    main.selection(args.selection)
+
+    histogram_names = list(args.histograms)
+    if args.pattern or not histogram_names:
+        histogram_names += [name for name in batch_histograms(args.pattern or ["*"])
+                            if name not in histogram_names]
+    if not histogram_names:
+        print "No histograms to plot."
+        return 1
+
+    workers = args.workers if args.workers > 0 else multiprocessing.cpu_count()
+    formats = [extension.strip() for extension in args.formats.split(",") if extension.strip()]
+    book = PlotBook(args.book, not args.no_toc) if args.book else None
+    results = run_batch(histogram_names, args.config, args.selection, min(workers, len(histogram_names)),
+                        formats, book)
+    return 0 if all(not result[3] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_batch())
@@ -10,10 +10,32 @@ if startup_file and os.path.isfile(startup_file):
 
 
 ########################################
-# loading bROT
+# loading bROT, ROOT itself is loaded on first use
+import time
+startup_times = [time.time()]
 print "Loading bROT ..."
 execfile("main.py")
+startup_times.append(time.time())
 
 print "Loading exported functions ..."
-execfile("export.py")
+from lazyexport import register_functions
+register_functions("export.py", globals())
+startup_times.append(time.time())
+
 brot_init()
+startup_times.append(time.time())
+
+startup_times = [end - start for start, end in zip(startup_times, startup_times[1:])]
+print "Started in {0:.2f} s (bROT {1:.2f} s, exported functions {2:.2f} s, initialization {3:.2f} s)".format(
+    sum(startup_times), *startup_times)
+if not ROOT.is_loaded():
+    print "ROOT is loaded on first use, use ROOT.<name> for ROOT objects until then."
+
+
+########################################
+# bare ROOT names at the prompt, e.g. gPad or TH1F, are imported along with ROOT,
+# as 'from ROOT import *' would import it right away; until then use ROOT.TH1F
+def import_root_names():
+    exec "from ROOT import *" in globals()
+
+ROOT.on_load(import_root_names)
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+
+from lazyroot import ROOT
+
+
+class CanvasPool():
+    """Pool of canvases, reused by their size instead of being constructed for
+    every plot. A canvas requested with the grid it already has is cleared
+    and its pads are restored in place, otherwise it is divided anew. The
+    least recently used canvases are closed, if there are too many."""
+
+    def __init__(self, max_canvases = 4):
+        self.max_canvases = max_canvases  # maximal number of open canvases
+        self.canvases     = OrderedDict() # (width, height) : TCanvas, least recently used first
+        self.grids        = {}            # (width, height) : ((divide_x, divide_y), [(xlow, ylow, xup, yup) of every pad])
+
+    def get(self, divide_x, divide_y, width, height):
+        """Returns a cleared canvas of the given size, divided into divide_x
+        times divide_y pads."""
+
+        key = (width, height)
+        t_canvas = self.canvases.pop(key, None)
+
+        # canvases closed by the user have to be constructed again
+        if not t_canvas or not ROOT.gROOT.GetListOfCanvases().FindObject(t_canvas.GetName()):
+            name = "gCanvas_{0}x{1}".format(width, height)
+            t_canvas = ROOT.TCanvas(name, "Analysis", 0, 0, width, height)
+            self.grids.pop(key, None)
+        elif t_canvas.GetWindowWidth() != width or t_canvas.GetWindowHeight() != height:
+            # undo resizing, e.g. by ratio()
+            t_canvas.SetWindowSize(width, height)
+        self.canvases[key] = t_canvas
+        self.evict()
+
+        grid = self.grids.get(key)
+        if not grid or grid[0] != (divide_x, divide_y) or not self.reset_pads(t_canvas, grid[1]):
+            self.divide(key, divide_x, divide_y)
+
+        return t_canvas
+
+    def evict(self):
+        """Closes the least recently used canvases until the limit of open
+        canvases is met."""
+
+        while len(self.canvases) > max(self.max_canvases, 1):
+            key, t_canvas = self.canvases.popitem(last = False)
+            self.grids.pop(key, None)
+            if ROOT.gROOT.GetListOfCanvases().FindObject(t_canvas.GetName()):
+                t_canvas.Close()
+
+    def divide(self, key, divide_x, divide_y):
+        """Clears the canvas of size key and divides it, remembering the pad
+        positions."""
+
+        t_canvas = self.canvases[key]
+        t_canvas.Clear()
+        t_canvas.Divide(divide_x, divide_y)
+
+        geometry = []
+        for i in range(1, divide_x * divide_y + 1):
+            pad = t_canvas.GetPad(i)
+            geometry.append((pad.GetXlowNDC(), pad.GetYlowNDC(),
+                             pad.GetXlowNDC() + pad.GetWNDC(), pad.GetYlowNDC() + pad.GetHNDC()))
+        self.grids[key] = ((divide_x, divide_y), geometry)
+
+    def reset_pads(self, t_canvas, geometry):
+        """Clears the pads of the canvas and restores their positions and the
+        attributes of the style, e.g. margins, grid, ticks and logarithmic axes,
+        removing all other objects drawn on the canvas, e.g. ratio pads. Returns
+        False if the pads of the canvas do not match the geometry anymore."""
+
+        pads = [t_canvas.GetPad(i) for i in range(1, len(geometry) + 1)]
+        if not all(pads):
+            return False
+
+        primitives = t_canvas.GetListOfPrimitives()
+        for primitive in list(primitives):
+            if not any(primitive == pad for pad in pads):
+                primitives.Remove(primitive)
+
+        for pad, (xlow, ylow, xup, yup) in zip(pads, geometry):
+            pad.Clear()
+            pad.SetPad(xlow, ylow, xup, yup)
+            pad.ResetAttPad() # margins and frame as in gStyle
+            pad.SetGrid(ROOT.gStyle.GetPadGridX(), ROOT.gStyle.GetPadGridY())
+            pad.SetTicks(ROOT.gStyle.GetPadTickX(), ROOT.gStyle.GetPadTickY())
+            pad.SetLogx(0)
+            pad.SetLogy(0)
+            pad.SetLogz(0)
+            pad.Modified()
+        t_canvas.Modified()
+        return True
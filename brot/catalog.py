@@ -0,0 +1,131 @@
+import os
+import json
+import fnmatch
+from collections import namedtuple
+
+from lazyroot import ROOT
+
+
+# summary of a histogram found in the analysis files
+HistogramEntry = namedtuple("HistogramEntry", ["name", "class_name", "nbins", "xmin", "xmax", "samples"])
+
+
+def scan_file(file_path):
+    """Returns the class, number of bins and axis range of all histograms in
+    the ROOT file at file_path as a dictionary name : [class, nbins, xmin, xmax]."""
+
+    histograms = {}
+    t_file = ROOT.TFile.Open(file_path)
+    if not t_file or t_file.IsZombie():
+        print "Could not open file", file_path
+        return histograms
+
+    for key in t_file.GetListOfKeys():
+        # keys are sorted by cycle, only the highest cycle is used
+        name = key.GetName()
+        if name in histograms:
+            continue
+
+        class_name = key.GetClassName()
+        t_class = ROOT.TClass.GetClass(class_name)
+        if not t_class or not t_class.InheritsFrom("TH1"):
+            continue
+
+        histo = key.ReadObj()
+        x_axis = histo.GetXaxis()
+        histograms[name] = [class_name, x_axis.GetNbins(), x_axis.GetXmin(), x_axis.GetXmax()]
+        histo.Delete()
+
+    t_file.Close()
+    return histograms
+
+
+class Catalog():
+    """Index of the histograms contained in the ROOT files of an analysis
+    directory. The index is stored on disk and only the files which changed
+    since the last scan are scanned again."""
+
+    def __init__(self, directory, index_path):
+        self.directory  = directory  # directory of the ROOT files
+        self.index_path = index_path # path of the index on disk
+        self.files      = {}         # sample : {"mtime" : mtime, "histograms" : {name : [class, nbins, xmin, xmax]}}
+        self.histograms = {}         # name : HistogramEntry
+
+    def load(self):
+        """Reads the index from disk, if it exists. A broken index is dropped,
+        so that all files are scanned again by update()."""
+
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r") as f:
+                    self.files = json.load(f)
+                self.build_entries()
+                return
+            except (ValueError, KeyError):
+                self.files = {}
+        self.build_entries()
+
+    def save(self):
+        """Writes the index to disk."""
+
+        path = os.path.dirname(self.index_path)
+        if path and not os.path.exists(path):
+            os.makedirs(path)
+        with open(self.index_path, "w") as f:
+            json.dump(self.files, f)
+
+    def sample_mtimes(self):
+        """Returns the modification times of all ROOT files in the directory
+        as a dictionary sample : mtime."""
+
+        mtimes = {}
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(".root"):
+                mtimes[file_name[:-len(".root")]] = os.path.getmtime(os.path.join(self.directory, file_name))
+        return mtimes
+
+    def update(self, map_function = map):
+        """Scans all files that are new or changed since the last scan, using
+        map_function to distribute the files over workers. Returns the number
+        of scanned files."""
+
+        mtimes = self.sample_mtimes()
+
+        # forget removed files
+        for sample in set(self.files) - set(mtimes):
+            del self.files[sample]
+
+        stale = sorted(sample for sample, mtime in mtimes.iteritems()
+                       if sample not in self.files or self.files[sample]["mtime"] != mtime)
+        if stale:
+            paths = [os.path.join(self.directory, sample + ".root") for sample in stale]
+            for sample, histograms in zip(stale, map_function(scan_file, paths)):
+                self.files[sample] = {"mtime" : mtimes[sample], "histograms" : histograms}
+            self.save()
+
+        self.build_entries()
+        return len(stale)
+
+    def build_entries(self):
+        """Combines the histograms of the individual files into one entry per
+        histogram name."""
+
+        self.histograms = {}
+        for sample in sorted(self.files):
+            for name, (class_name, nbins, xmin, xmax) in self.files[sample]["histograms"].iteritems():
+                name = str(name)
+                if name not in self.histograms:
+                    self.histograms[name] = HistogramEntry(name, str(class_name), nbins, xmin, xmax, [])
+                self.histograms[name].samples.append(str(sample))
+
+    def get(self, name):
+        """Returns the HistogramEntry of the histogram name or None, if no file
+        contains it."""
+
+        return self.histograms.get(name)
+
+    def names(self, pattern = "*"):
+        """Returns the sorted names of all histograms matching the shell-style
+        pattern."""
+
+        return sorted(fnmatch.filter(self.histograms, pattern))
@@ -0,0 +1,75 @@
+import os
+import cPickle
+import hashlib
+
+
+def file_digest(file_path):
+    """Returns the md5 hash of the contents of the file at file_path."""
+
+    with open(file_path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+class ConfigSnapshot():
+    """Pickled snapshot of the validated plotting config and the cross section
+    config. It stays valid as long as the config, the configspec and the cross
+    section file are unchanged, which is checked by their modification times
+    and, if those changed, by the hashes of their contents."""
+
+    def __init__(self, path):
+        self.path  = path # path of the snapshot on disk
+        self.files = {}   # path : [mtime, md5] of the files the snapshot was made from
+
+    def is_current(self):
+        """Returns whether all files are unchanged since the snapshot was made
+        and whether any of them was touched without changing its contents.
+        Touched files get their new modification time."""
+
+        touched = False
+        for file_path, signature in self.files.iteritems():
+            if not os.path.exists(file_path):
+                return False, touched
+            mtime = os.path.getmtime(file_path)
+            if mtime != signature[0]:
+                if file_digest(file_path) != signature[1]:
+                    return False, touched
+                signature[0] = mtime
+                touched = True
+        return True, touched
+
+    def load(self):
+        """Returns the (config, xs config, validation result) of the snapshot
+        or None, if there is no current snapshot."""
+
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, "rb") as f:
+                self.files, configs = cPickle.load(f)
+        except Exception:
+            return None
+
+        current, touched = self.is_current()
+        if not current:
+            return None
+        if touched:
+            self.write(configs) # hash touched files only once
+        return configs
+
+    def save(self, file_paths, cfg, xs_cfg, valid):
+        """Stores the configs together with the signatures of file_paths."""
+
+        self.files = dict((os.path.realpath(file_path),
+                           [os.path.getmtime(file_path), file_digest(file_path)]) for file_path in file_paths)
+        self.write((cfg, xs_cfg, valid))
+
+    def write(self, configs):
+        """Writes the signatures and the configs to disk."""
+
+        path = os.path.dirname(self.path)
+        if path and not os.path.exists(path):
+            os.makedirs(path)
+        with open(self.path + ".tmp", "wb") as f:
+            cPickle.dump((self.files, configs), f, cPickle.HIGHEST_PROTOCOL)
+        os.rename(self.path + ".tmp", self.path)
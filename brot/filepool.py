@@ -0,0 +1,59 @@
+import os
+import threading
+from collections import OrderedDict
+
+from lazyroot import ROOT
+
+
+class FilePool():
+    """Keeps a limited number of ROOT files open, so that repeated reads from
+    the same analysis files do not have to reopen them every time."""
+
+    def __init__(self, max_open_files = 64):
+        self.max_open_files = max_open_files # maximal number of open files
+        self.files          = OrderedDict()  # path : (mtime, TFile), least recently used first
+        self.lock           = threading.RLock() # guards the pool when loading in threads
+
+    def get(self, file_path, evict = True):
+        """Returns an open TFile for file_path. Files that have been modified since
+        they were opened are reopened. Unless evict is False, the least recently
+        used files are closed if there are too many open files."""
+
+        path = os.path.realpath(file_path)
+        mtime = os.path.getmtime(path)
+
+        with self.lock:
+            # reuse the open file if it is still up to date
+            if path in self.files:
+                open_mtime, t_file = self.files.pop(path)
+                if open_mtime == mtime and t_file.IsOpen():
+                    self.files[path] = (open_mtime, t_file)
+                    return t_file
+                t_file.Close()
+
+            t_file = ROOT.TFile.Open(path)
+            if not t_file or t_file.IsZombie():
+                print "Could not open file", path
+                return None
+
+            self.files[path] = (mtime, t_file)
+            if evict:
+                self.evict()
+            return t_file
+
+    def evict(self):
+        """Closes the least recently used files until the limit of open files
+        is met."""
+
+        with self.lock:
+            while len(self.files) > max(self.max_open_files, 1):
+                path, (mtime, t_file) = self.files.popitem(last = False)
+                t_file.Close()
+
+    def close(self):
+        """Closes all files of the pool."""
+
+        with self.lock:
+            while self.files:
+                path, (mtime, t_file) = self.files.popitem()
+                t_file.Close()
@@ -0,0 +1,73 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class HistogramCache():
+    """Keeps unscaled copies of the histograms read from the analysis files in
+    memory. Histograms are only handed out as copies, so that in-place
+    operations like scale() do not alter the cached entries."""
+
+    def __init__(self, max_size = 512.):
+        self.max_size   = max_size      # memory budget in MB
+        self.size       = 0             # current memory usage in bytes
+        self.histograms = OrderedDict() # (path, name, mtime) : (size, Histogram), least recently used first
+        self.lock       = threading.RLock() # guards the cache when composing plots in threads
+
+    def key(self, file_path, histogram_name):
+        """Returns the cache key of a histogram, which changes together with the
+        modification time of its file."""
+
+        path = os.path.realpath(file_path)
+        return (path, histogram_name, os.path.getmtime(path))
+
+    def contains(self, file_path, histogram_name):
+        """Returns whether the histogram is cached."""
+
+        return self.key(file_path, histogram_name) in self.histograms
+
+    def get(self, file_path, histogram_name):
+        """Returns a copy of the cached histogram or None, if it is not cached."""
+
+        key = self.key(file_path, histogram_name)
+        with self.lock:
+            if key not in self.histograms:
+                return None
+
+            # move entry to the end, marking it as recently used
+            entry = self.histograms.pop(key)
+            self.histograms[key] = entry
+        return entry[1].copy()
+
+    def put(self, file_path, histogram_name, histogram):
+        """Stores a copy of the histogram and evicts the least recently used
+        histograms, if the memory budget is exceeded."""
+
+        if self.max_size <= 0.:
+            return
+
+        key = self.key(file_path, histogram_name)
+        size = histogram.edges.nbytes + histogram.contents.nbytes + histogram.sumw2.nbytes
+        with self.lock:
+            if key in self.histograms:
+                self.size -= self.histograms.pop(key)[0]
+
+            self.histograms[key] = (size, histogram.copy())
+            self.size += size
+            self.evict()
+
+    def evict(self):
+        """Removes the least recently used histograms until the cache fits into
+        its memory budget."""
+
+        with self.lock:
+            while self.histograms and self.size > self.max_size * 1024 * 1024:
+                key, (size, histogram) = self.histograms.popitem(last = False)
+                self.size -= size
+
+    def clear(self):
+        """Removes all histograms from the cache."""
+
+        with self.lock:
+            self.histograms.clear()
+            self.size = 0
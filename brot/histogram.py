@@ -0,0 +1,426 @@
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+from lazyroot import ROOT
+
+
+# numpy types of the bin content buffers of the basic histogram classes
+BUFFER_TYPES = {"TH1D" : np.float64, "TH1F" : np.float32, "TH1I" : np.int32,
+                "TH1S" : np.int16,   "TH1C" : np.int8}
+
+
+def rebin_starts(edges, bins):
+    """Returns the new bin edges and the positions of the cells in the contents
+    at which the new bins, including under- and overflow, start. If bins is an
+    integer, the respective number of bins are merged, remaining bins are moved
+    into the overflow. Otherwise bins are the new bin edges, which have to
+    coincide with existing edges, and the old bins outside of them are moved
+    into the under- and overflow, like TH1::Rebin() does.
+
+    >>> hist = Histogram("h", range(6), [1, 1, 2, 3, 4, 5, 10], [1, 1, 2, 3, 4, 5, 10])
+    >>> rebinned = hist.rebin(2)
+    >>> rebinned.edges.tolist(), rebinned.contents.tolist()
+    ([0.0, 2.0, 4.0], [1.0, 3.0, 7.0, 15.0])
+    >>> rebinned = hist.rebin([1, 3])
+    >>> rebinned.edges.tolist(), rebinned.contents.tolist(), rebinned.sumw2.tolist()
+    ([1.0, 3.0], [2.0, 5.0, 19.0], [2.0, 5.0, 19.0])
+    >>> hist.rebin([1, 2.5])
+    Traceback (most recent call last):
+    ValueError: New bin edges have to coincide with existing bin edges.
+    """
+
+    nbins = len(edges) - 1
+    if isinstance(bins, int):
+        new_edges = edges[:(nbins // bins) * bins + 1:bins]
+    else:
+        new_edges = np.asarray(bins, dtype = np.float64)
+
+    # positions of the new edges among the old edges
+    indices = np.clip(np.searchsorted(edges, new_edges), 0, nbins)
+    if (len(new_edges) < 2 or np.any(np.diff(indices) <= 0) or
+        not np.allclose(edges[indices], new_edges, rtol = 1e-9, atol = 1e-12)):
+        raise ValueError("New bin edges have to coincide with existing bin edges.")
+
+    # new bins sum up the old bins between their edges, the old bins
+    # outside of the new edges are added to the under- and overflow
+    return edges[indices], np.concatenate(([0], indices + 1))
+
+
+def read_buffer(buffer, size, dtype = np.float64):
+    """Copies size values of a PyROOT buffer into a numpy array of doubles."""
+
+    if hasattr(buffer, "SetSize"):
+        buffer.SetSize(size) # PyROOT buffers do not know their size
+    elif hasattr(buffer, "reshape"):
+        buffer.reshape((size,)) # neither do cppyy low level views
+    return np.frombuffer(buffer, dtype = dtype, count = size).astype(np.float64)
+
+
+class Histogram(object):
+    """One dimensional histogram holding its bin edges, and its bin contents and
+    squared weights including under- and overflow as numpy arrays. All of
+    bROT's arithmetic is done on these histograms, they are only converted into
+    a ROOT TH1D for drawing."""
+
+    __slots__ = ("name", "title", "xtitle", "ytitle", "edges", "contents", "sumw2")
+
+    def __init__(self, name, edges, contents, sumw2, title = "", xtitle = "", ytitle = ""):
+        self.name     = name     # name of the histogram
+        self.title    = title    # title of the histogram
+        self.xtitle   = xtitle   # title of the x-axis
+        self.ytitle   = ytitle   # title of the y-axis
+        self.edges    = np.asarray(edges, dtype = np.float64)    # nbins + 1 bin edges
+        self.contents = np.asarray(contents, dtype = np.float64) # nbins + 2 bin contents
+        self.sumw2    = np.asarray(sumw2, dtype = np.float64)    # nbins + 2 sums of squared weights
+
+    @classmethod
+    def from_th1(cls, histo):
+        """Creates a histogram from a one dimensional ROOT histogram."""
+
+        nbins = histo.GetNbinsX()
+        x_axis = histo.GetXaxis()
+
+        # bin edges are only stored for variable binning
+        if x_axis.GetXbins().GetSize():
+            edges = read_buffer(x_axis.GetXbins().GetArray(), nbins + 1)
+        else:
+            edges = np.linspace(x_axis.GetXmin(), x_axis.GetXmax(), nbins + 1)
+
+        class_name = histo.ClassName()
+        if class_name in BUFFER_TYPES:
+            contents = read_buffer(histo.GetArray(), nbins + 2, BUFFER_TYPES[class_name])
+            if histo.GetSumw2N():
+                sumw2 = read_buffer(histo.GetSumw2().GetArray(), nbins + 2)
+            else:
+                sumw2 = contents.copy()
+        else:
+            # e.g. profiles, whose bin contents have to be computed
+            contents = np.array([histo.GetBinContent(i) for i in range(nbins + 2)])
+            sumw2 = np.array([histo.GetBinError(i) for i in range(nbins + 2)])**2
+
+        return cls(histo.GetName(), edges, contents, sumw2, histo.GetTitle(),
+                   x_axis.GetTitle(), histo.GetYaxis().GetTitle())
+
+    def to_th1(self, name = None):
+        """Creates a TH1D, which is not owned by any ROOT directory."""
+
+        add_directory = ROOT.TH1.AddDirectoryStatus()
+        ROOT.TH1.AddDirectory(False) # avoid that the histogram ends up in the current file
+        histo = ROOT.TH1D(name or self.name, self.title, self.nbins, array("d", self.edges))
+        ROOT.TH1.AddDirectory(add_directory)
+
+        histo.SetContent(array("d", self.contents))
+        histo.Sumw2()
+        histo.GetSumw2().Set(len(self.sumw2), array("d", self.sumw2))
+        histo.ResetStats()
+        histo.GetXaxis().SetTitle(self.xtitle)
+        histo.GetYaxis().SetTitle(self.ytitle)
+        return histo
+
+    def copy(self):
+        """Returns an independent copy of the histogram."""
+
+        return Histogram(self.name, self.edges.copy(), self.contents.copy(), self.sumw2.copy(),
+                         self.title, self.xtitle, self.ytitle)
+
+    @property
+    def nbins(self):
+        """Number of bins without under- and overflow."""
+
+        return len(self.edges) - 1
+
+    @property
+    def widths(self):
+        """Widths of the bins without under- and overflow."""
+
+        return np.diff(self.edges)
+
+    @property
+    def errors(self):
+        """Bin errors including under- and overflow."""
+
+        return np.sqrt(self.sumw2)
+
+    def integral(self):
+        """Sum of the bin contents without under- and overflow."""
+
+        return self.contents[1:-1].sum()
+
+    def maximum(self):
+        """Highest bin content without under- and overflow."""
+
+        return self.contents[1:-1].max() if self.nbins else 0.
+
+    def scale(self, factor):
+        """Scales the bin contents and errors by factor."""
+
+        self.contents *= factor
+        self.sumw2 *= factor**2
+        return self
+
+    def scale_bins(self, factors):
+        """Scales the bin contents and errors without under- and overflow by the
+        individual factors."""
+
+        self.contents[1:-1] *= factors
+        self.sumw2[1:-1] *= factors**2
+        return self
+
+    def add(self, other):
+        """Adds the bin contents of the other histogram."""
+
+        self.contents += other.contents
+        self.sumw2 += other.sumw2
+        return self
+
+    def add_quadratic(self, other):
+        """Adds the bin contents of the other histogram in quadrature."""
+
+        self.contents = np.sqrt(self.contents**2 + other.contents**2)
+        return self
+
+    def divide(self, other):
+        """Divides by the bin contents of the other histogram, treating both as
+        uncorrelated like TH1::Divide() does. Bins with a content of zero in the
+        other histogram are set to zero.
+
+        >>> numerator = Histogram("n", [0, 1, 2], [0, 4, 3, 0], [0, 4, 3, 0])
+        >>> denominator = Histogram("d", [0, 1, 2], [0, 2, 0, 0], [0, 1, 0, 0])
+        >>> ratio = numerator.divide(denominator)
+        >>> ratio.contents.tolist(), ratio.sumw2.tolist()
+        ([0.0, 2.0, 0.0, 0.0], [0.0, 2.0, 0.0, 0.0])
+        """
+
+        numerator, denominator = self.contents, other.contents
+        valid = denominator != 0.
+        safe_denominator = np.where(valid, denominator, 1.)
+        self.contents = np.where(valid, numerator / safe_denominator, 0.)
+        self.sumw2 = np.where(valid, (self.sumw2 * denominator**2 + other.sumw2 * numerator**2) /
+                                     safe_denominator**4, 0.)
+        return self
+
+    def cumulative(self, forward = False, overflow = False):
+        """Transforms the histogram into a cumulative distribution, see
+        accumulate_histograms()."""
+
+        accumulate_histograms([self], forward, overflow)
+        return self
+
+    def rebin(self, bins):
+        """Returns a rebinned copy of the histogram, see rebin_starts()."""
+
+        edges, starts = rebin_starts(self.edges, bins)
+        return Histogram(self.name, edges,
+                         np.add.reduceat(self.contents, starts),
+                         np.add.reduceat(self.sumw2, starts),
+                         self.title, self.xtitle, self.ytitle)
+
+
+def cumulative_sum(values, forward, overflow):
+    """Replaces the regular bins of each row of values by their cumulative sum,
+    running backward from the last bin or forward from the first bin, and
+    starting from the over- or underflow if requested. Without overflow, this
+    is what TH1::GetCumulative() does.
+
+    >>> def cumulative(forward, overflow):
+    ...     values = np.array([[1., 1., 2., 3., 4.]])
+    ...     cumulative_sum(values, forward, overflow)
+    ...     return values.tolist()
+    >>> cumulative(False, False), cumulative(False, True)
+    ([[1.0, 6.0, 5.0, 3.0, 4.0]], [[1.0, 10.0, 9.0, 7.0, 4.0]])
+    >>> cumulative(True, False), cumulative(True, True)
+    ([[1.0, 1.0, 3.0, 6.0, 4.0]], [[1.0, 2.0, 4.0, 7.0, 4.0]])
+    """
+
+    if forward:
+        start = 0 if overflow else 1
+        values[:, start:-1] = np.cumsum(values[:, start:-1], axis = 1)
+    else:
+        stop = values.shape[1] if overflow else -1
+        values[:, 1:stop] = np.cumsum(values[:, 1:stop][:, ::-1], axis = 1)[:, ::-1]
+
+
+def accumulate_histograms(histograms, forward = False, overflow = False):
+    """Transforms histograms sharing the same binning into cumulative
+    distributions with one cumulative sum over all of them. By default every
+    bin holds the sum of itself and all following bins, with forward it holds
+    the sum of itself and all previous bins. With overflow, the overflow, or
+    underflow respectively, is included in the sums."""
+
+    if not histograms:
+        return
+    if len(set(len(histogram.contents) for histogram in histograms)) > 1:
+        raise ValueError("Histograms have to share the same binning.")
+
+    contents = np.array([histogram.contents for histogram in histograms])
+    sumw2 = np.array([histogram.sumw2 for histogram in histograms])
+    cumulative_sum(contents, forward, overflow)
+    cumulative_sum(sumw2, forward, overflow)
+
+    for histogram, histogram_contents, histogram_sumw2 in zip(histograms, contents, sumw2):
+        histogram.contents = histogram_contents
+        histogram.sumw2 = histogram_sumw2
+
+
+class HistogramTensor(object):
+    """Histograms of several samples sharing the same binning, stored as one
+    samples x bins matrix of bin contents and one of squared weights, both
+    including under- and overflow. Every row belongs to a record, e.g. a
+    process, and the rows are grouped by the labels of their records."""
+
+    __slots__ = ("name", "title", "xtitle", "ytitle", "edges", "contents", "sumw2", "records", "groups")
+
+    def __init__(self, records, edges, contents, sumw2, name = "", title = "", xtitle = "", ytitle = ""):
+        self.name     = name     # name of the histograms
+        self.title    = title    # title of the histograms
+        self.xtitle   = xtitle   # title of the x-axis
+        self.ytitle   = ytitle   # title of the y-axis
+        self.edges    = np.asarray(edges, dtype = np.float64)    # nbins + 1 bin edges
+        self.contents = np.asarray(contents, dtype = np.float64) # samples x (nbins + 2) bin contents
+        self.sumw2    = np.asarray(sumw2, dtype = np.float64)    # samples x (nbins + 2) sums of squared weights
+        self.records  = list(records) # record of every row, carrying a label
+
+        # rows of every label, in the order of their first appearance
+        groups = OrderedDict()
+        for row, record in enumerate(self.records):
+            groups.setdefault(record.label, []).append(row)
+        self.groups = OrderedDict((label, np.array(rows)) for label, rows in groups.iteritems())
+
+    @classmethod
+    def from_histograms(cls, records, histograms):
+        """Stacks the histograms, belonging to the records, into one tensor."""
+
+        if len(set(len(histogram.contents) for histogram in histograms)) > 1:
+            raise ValueError("Histograms have to share the same binning.")
+
+        first = histograms[0]
+        return cls(records, first.edges.copy(),
+                   np.array([histogram.contents for histogram in histograms]),
+                   np.array([histogram.sumw2 for histogram in histograms]),
+                   first.name, first.title, first.xtitle, first.ytitle)
+
+    def __len__(self):
+        return len(self.records)
+
+    def derive(self, records, edges, contents, sumw2):
+        """Returns a new tensor with the names and titles of this one."""
+
+        return HistogramTensor(records, edges, contents, sumw2,
+                               self.name, self.title, self.xtitle, self.ytitle)
+
+    def copy(self):
+        """Returns an independent copy of the tensor, sharing the records."""
+
+        return self.derive(self.records, self.edges.copy(), self.contents.copy(), self.sumw2.copy())
+
+    @property
+    def widths(self):
+        """Widths of the bins without under- and overflow."""
+
+        return np.diff(self.edges)
+
+    def histogram(self, row):
+        """Returns the histogram of a row, sharing its arrays with the tensor."""
+
+        return Histogram(self.name, self.edges, self.contents[row], self.sumw2[row],
+                         self.title, self.xtitle, self.ytitle)
+
+    def integrals(self):
+        """Sums of the bin contents of every row without under- and overflow."""
+
+        return self.contents[:, 1:-1].sum(axis = 1)
+
+    def total(self):
+        """Returns the sum of all rows as histogram."""
+
+        return Histogram(self.name, self.edges.copy(), self.contents.sum(axis = 0),
+                         self.sumw2.sum(axis = 0), self.title, self.xtitle, self.ytitle)
+
+    def scale_rows(self, factors):
+        """Scales the bin contents and errors of every row by its factor."""
+
+        factors = np.asarray(factors, dtype = np.float64)[:, np.newaxis]
+        self.contents *= factors
+        self.sumw2 *= factors**2
+        return self
+
+    def scale_bins(self, factors):
+        """Scales the bin contents and errors without under- and overflow of all
+        rows by the factors per bin, e.g. the inverse bin widths like
+        TH1::Scale(1., "width") does.
+
+        >>> tensor = HistogramTensor([], [0, 1, 3], [[0, 4, 6, 0]], [[0, 4, 6, 0]])
+        >>> tensor = tensor.scale_bins(1. / tensor.widths)
+        >>> tensor.contents.tolist(), tensor.sumw2.tolist()
+        ([[0.0, 4.0, 3.0, 0.0]], [[0.0, 4.0, 1.5, 0.0]])
+        """
+
+        self.contents[:, 1:-1] *= factors
+        self.sumw2[:, 1:-1] *= factors**2
+        return self
+
+    def cumulative(self, forward = False, overflow = False):
+        """Transforms all rows into cumulative distributions, see
+        accumulate_histograms()."""
+
+        cumulative_sum(self.contents, forward, overflow)
+        cumulative_sum(self.sumw2, forward, overflow)
+        return self
+
+    def rebin(self, bins):
+        """Returns a rebinned copy of the tensor, see rebin_starts()."""
+
+        edges, starts = rebin_starts(self.edges, bins)
+        return self.derive(self.records, edges,
+                           np.add.reduceat(self.contents, starts, axis = 1),
+                           np.add.reduceat(self.sumw2, starts, axis = 1))
+
+    def take(self, rows):
+        """Returns a tensor of the given rows in the given order."""
+
+        return self.derive([self.records[row] for row in rows], self.edges.copy(),
+                           self.contents[rows], self.sumw2[rows])
+
+    def ordered(self):
+        """Returns a copy of the tensor with the rows ordered by their integral."""
+
+        return self.take(np.argsort(self.integrals(), kind = "mergesort"))
+
+    def merge(self, style = "linear"):
+        """Returns a tensor with one row per label, summing the rows of every
+        label and keeping the record of their first row. With style 'quadratic',
+        the bin contents are added in quadrature and the squared weights of the
+        first row are kept.
+
+        >>> from collections import namedtuple
+        >>> Record = namedtuple("Record", ["label"])
+        >>> tensor = HistogramTensor([Record("a"), Record("b"), Record("a")], [0, 1],
+        ...                          [[0, 3, 0], [0, 1, 0], [0, 4, 0]], [[0, 9, 0], [0, 1, 0], [0, 16, 0]])
+        >>> merged = tensor.merge()
+        >>> merged.records, merged.contents.tolist(), merged.sumw2.tolist()
+        ([Record(label='a'), Record(label='b')], [[0.0, 7.0, 0.0], [0.0, 1.0, 0.0]], [[0.0, 25.0, 0.0], [0.0, 1.0, 0.0]])
+        >>> merged = tensor.merge("quadratic")
+        >>> merged.contents.tolist(), merged.sumw2.tolist()
+        ([[0.0, 5.0, 0.0], [0.0, 1.0, 0.0]], [[0.0, 9.0, 0.0], [0.0, 1.0, 0.0]])
+        """
+
+        rows = np.concatenate(self.groups.values())
+        starts = np.cumsum([0] + [len(group) for group in self.groups.values()])[:-1]
+        firsts = [group[0] for group in self.groups.values()]
+
+        if style == "quadratic":
+            contents = np.sqrt(np.add.reduceat(self.contents[rows]**2, starts, axis = 0))
+            sumw2 = self.sumw2[firsts]
+        else:
+            contents = np.add.reduceat(self.contents[rows], starts, axis = 0)
+            sumw2 = np.add.reduceat(self.sumw2[rows], starts, axis = 0)
+
+        return self.derive([self.records[first] for first in firsts], self.edges.copy(), contents, sumw2)
+
+
+if __name__ == "__main__":
+    # check the arithmetic against the results of the TH1 methods
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
@@ -0,0 +1,67 @@
+import ast
+import types
+
+from lazyroot import ROOT
+
+
+def parse_functions(export_file = "export.py"):
+    """Splits export_file into its functions and the remaining statements.
+    Returns a list of (name, first line, source) of the functions and the
+    module of the remaining statements."""
+
+    with open(export_file, "r") as f:
+        lines = f.read().splitlines(True)
+    tree = ast.parse("".join(lines), export_file)
+
+    # a function ends where the next statement begins
+    starts = [node.lineno - 1 for node in tree.body] + [len(lines)]
+    functions = [(node.name, start + 1, "".join(lines[start : end]).rstrip())
+                 for node, start, end in zip(tree.body, starts, starts[1:])
+                 if isinstance(node, ast.FunctionDef)]
+
+    statements = ast.Module([node for node in tree.body if not isinstance(node, ast.FunctionDef)])
+    return functions, statements
+
+
+
+def function_sources(export_file = "export.py"):
+    """Returns the source text of every function defined in export_file as a
+    dictionary name : source."""
+
+    return dict((name, source) for name, first_line, source in parse_functions(export_file)[0])
+
+
+
+def with_root_names(function, namespace):
+    """Returns a stand-in of an exported function, which adds the bare ROOT
+    names used by the function to namespace on its first call, replaces
+    itself by the function and calls it."""
+
+    def stand_in(*args, **kwargs):
+        ROOT.add_names(function.func_code, namespace)
+        if namespace.get(function.__name__) is stand_in:
+            namespace[function.__name__] = function
+        return function(*args, **kwargs)
+
+    stand_in.__name__ = function.__name__
+    stand_in.__doc__ = function.__doc__
+    return stand_in
+
+
+
+def register_functions(export_file, namespace):
+    """Executes export_file in namespace. The bare ROOT names used by its
+    functions are only added on their first call, so that ROOT is not imported
+    before a function needs it. Returns the number of functions."""
+
+    with open(export_file, "r") as f:
+        code = compile(f.read() + "\n", export_file, "exec")
+    ROOT.add_names(code, namespace, nested = False)
+    exec code in namespace
+
+    functions = [name for name, value in namespace.items()
+                 if isinstance(value, types.FunctionType) and value.func_code.co_filename == export_file]
+    for name in functions:
+        namespace[name] = with_root_names(namespace[name], namespace)
+
+    return len(functions)
@@ -0,0 +1,110 @@
+import sys
+import dis
+import time
+import types
+
+
+def instructions(code):
+    """Yields the (offset, name, argument) of every instruction of code, the
+    argument is None for instructions without one."""
+
+    i, extended_arg = 0, 0
+    while i < len(code.co_code):
+        op = ord(code.co_code[i])
+        if op < dis.HAVE_ARGUMENT:
+            yield i, dis.opname[op], None
+            i += 1
+            continue
+        arg = ord(code.co_code[i + 1]) + ord(code.co_code[i + 2]) * 256 + extended_arg
+        extended_arg = arg << 16 if op == dis.EXTENDED_ARG else 0
+        yield i, dis.opname[op], arg
+        i += 3
+
+
+
+def global_names(code, nested = True):
+    """Returns the global names looked up by code and, if nested, by the
+    functions defined in it, leaving out the names code assigns itself."""
+
+    loaded, stored = set(), set()
+    for offset, name, arg in instructions(code):
+        if name in ("LOAD_GLOBAL", "LOAD_NAME"):
+            loaded.add(code.co_names[arg])
+        elif name in ("STORE_GLOBAL", "STORE_NAME", "IMPORT_NAME"):
+            stored.add(code.co_names[arg].split(".")[0])
+
+    for const in code.co_consts:
+        if nested and isinstance(const, types.CodeType):
+            loaded |= global_names(const)
+    return loaded - stored
+
+
+
+class LazyROOT(object):
+    """Stands in for the ROOT module and imports it only when one of its
+    attributes is used for the first time, as importing ROOT takes seconds.
+    Functions registered with on_load() are called right after the import,
+    e.g. to apply the plotting style. add_names() provides the bare ROOT names
+    to code run in a namespace."""
+
+    def __init__(self):
+        self._module    = None # the ROOT module, once imported
+        self._callbacks = []   # functions called after the import
+        self.load_time  = 0.   # time in s spent importing ROOT
+
+    def _load(self):
+        """Imports ROOT and calls the registered functions."""
+
+        start = time.time()
+        import ROOT
+        self._module = ROOT
+        self.load_time = time.time() - start
+        print "Loaded ROOT in {0:.2f} s".format(self.load_time)
+
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+        return ROOT
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._module or self._load(), name)
+
+    def add_names(self, code, namespace, nested = True):
+        """Adds the ROOT objects of the global names used by code, see
+        global_names(), but missing in namespace, e.g. TH1F, gPad or kRed, as
+        'from ROOT import *' did. ROOT is imported only if a name is missing.
+        Returns the added names."""
+
+        builtins = namespace.get("__builtins__", __builtins__)
+        if isinstance(builtins, types.ModuleType):
+            builtins = vars(builtins)
+        missing = sorted(name for name in global_names(code, nested) if name not in namespace and name not in builtins)
+
+        added = []
+        for name in missing:
+            try:
+                namespace[name] = getattr(self, name)
+                added.append(name)
+            except AttributeError:
+                pass # not a ROOT name either, left to raise a NameError
+        return added
+
+    def is_loaded(self):
+        """Returns whether ROOT has been imported already."""
+
+        return self._module is not None
+
+    def on_load(self, callback):
+        """Calls callback once ROOT is imported, or right away if it already is."""
+
+        if self._module is None and "ROOT" in sys.modules:
+            self._load() # imported elsewhere already
+        if self._module:
+            callback()
+        else:
+            self._callbacks.append(callback)
+
+
+ROOT = LazyROOT()
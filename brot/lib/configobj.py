@@ -1097,6 +1097,10 @@ class ConfigObj(Section):
         ''',
         re.VERBOSE)
 
+    # characters that leave a section name or an unquoted value to _parse
+    _fastnamechars = re.compile(r'[\[\]\'"#]')
+    _fastvaluechars = re.compile(r'[\'",]')
+
     _sectionmarker = re.compile(r'''^
         (\s*)                     # 1: indentation
         ((?:\[\s*)+)              # 2: section marker open
@@ -1315,7 +1319,8 @@ class ConfigObj(Section):
 
             infile = [line.rstrip('\r\n') for line in infile]
             
-        self._parse(infile)
+        if not self._fast_parse(infile):
+            self._parse(infile)
         # if we had any errors, now is the time to raise them
         if self._errors:
             info = "at line %s." % self._errors[0].line_number
@@ -1530,6 +1535,132 @@ class ConfigObj(Section):
             return value
 
 
+    def _fast_parse(self, infile):
+        """
+        Parse the config file with plain string operations instead of regexes.
+        
+        Only the common subset of the syntax is handled here: sections,
+        ``key = value`` lines with unquoted or double quoted single values and
+        comments. Anything else (lists, single quotes, multiline values, empty
+        values, errors) makes it give up and return ``False`` with the
+        ConfigObj reset, so that ``_parse`` can do the real work.
+        """
+        if self.unrepr or not self.list_values or self._inspec:
+            return False
+        indent_type = self.indent_type
+        set_value = dict.__setitem__
+        unsafe_name = self._fastnamechars.search
+        unsafe_value = self._fastvaluechars.search
+        
+        comment_list = []
+        done_start = False
+        this_section = self
+        reset_comment = False
+        
+        for line in infile:
+            if reset_comment:
+                comment_list = []
+            sline = line.strip()
+            if not sline or sline[0] == '#':
+                reset_comment = False
+                comment_list.append(line)
+                continue
+            
+            if not done_start:
+                self.initial_comment = comment_list
+                comment_list = []
+                done_start = True
+            
+            reset_comment = True
+            if self.indent_type is None:
+                indent = line[:len(line) - len(line.lstrip())]
+                if indent:
+                    self.indent_type = indent
+            
+            if sline[0] == '[':
+                comment = line[line.rfind(']') + 1:].lstrip()
+                if comment and comment[0] != '#':
+                    break
+                marker = sline[:sline.rfind(']') + 1]
+                sect_name = marker.lstrip('[')
+                cur_depth = len(marker) - len(sect_name)
+                sect_name = sect_name.rstrip(']')
+                if len(marker) - len(sect_name) - cur_depth != cur_depth:
+                    break
+                sect_name = sect_name.strip()
+                if not sect_name or unsafe_name(sect_name):
+                    break
+                
+                if cur_depth < this_section.depth:
+                    try:
+                        parent = self._match_depth(this_section,
+                                                   cur_depth).parent
+                    except SyntaxError:
+                        break
+                elif cur_depth == this_section.depth:
+                    parent = this_section.parent
+                elif cur_depth == this_section.depth + 1:
+                    parent = this_section
+                else:
+                    break
+                if sect_name in parent:
+                    break
+                
+                this_section = Section(parent, cur_depth, self, name=sect_name)
+                parent.sections.append(sect_name)
+                set_value(parent, sect_name, this_section)
+                parent.inline_comments[sect_name] = comment or None
+                parent.comments[sect_name] = comment_list
+                continue
+            
+            key, divider, value = line.partition('=')
+            key = key.strip()
+            if not divider or not key or key[0] in '\'"' or key in this_section:
+                break
+            value = value.lstrip()
+            if value[:1] == '"':
+                if value[:3] == '"""':
+                    break
+                close = value.find('"', 1)
+                if close == -1:
+                    break
+                comment = value[close + 1:].lstrip()
+                if comment and comment[0] != '#':
+                    break
+                value = value[1:close]
+            else:
+                start = value.find('#')
+                if start == -1:
+                    comment = ''
+                else:
+                    value, comment = value[:start], value[start:]
+                value = value.rstrip()
+                if not value or unsafe_value(value):
+                    break
+            
+            this_section.scalars.append(key)
+            set_value(this_section, key, value)
+            this_section.inline_comments[key] = comment or None
+            this_section.comments[key] = comment_list
+        else:
+            if self.indent_type is None:
+                self.indent_type = ''
+            
+            if not self and not self.initial_comment:
+                self.initial_comment = comment_list
+            elif not reset_comment:
+                self.final_comment = comment_list
+            return True
+        
+        # leave everything to the full parser
+        dict.clear(self)
+        Section._initialise(self)
+        self.indent_type = indent_type
+        self.initial_comment = []
+        self.final_comment = []
+        return False
+
+
     def _parse(self, infile):
         """Actually parse the config file."""
         temp_list_values = self.list_values
@@ -2172,23 +2303,34 @@ class ConfigObj(Section):
         # section.default_values.clear() #??
         configspec = section.configspec
         self._set_configspec(section, copy)
+        # parse every check and convert its default only once, instead of
+        # again for every section sharing the configspec, e.g. by __many__
+        compiled = hasattr(validator, 'compile_section')
+        if compiled:
+            checks = validator.compile_section(configspec)
 
         
         def validate_entry(entry, spec, val, missing, ret_true, ret_false):
             section.default_values.pop(entry, None)
                 
             try:
-                section.default_values[entry] = validator.get_default_value(configspec[entry])
+                if compiled:
+                    section.default_values[entry] = checks[entry].get_default_value()
+                else:
+                    section.default_values[entry] = validator.get_default_value(configspec[entry])
             except (KeyError, AttributeError, validator.baseErrorClass):
                 # No default, bad default or validator has no 'get_default_value'
                 # (e.g. SimpleVal)
                 pass
             
             try:
-                check = validator.check(spec,
-                                        val,
-                                        missing=missing
-                                        )
+                if compiled:
+                    check = spec(val, missing=missing)
+                else:
+                    check = validator.check(spec,
+                                            val,
+                                            missing=missing
+                                            )
             except validator.baseErrorClass, e:
                 if not preserve_errors or isinstance(e, self._vdtMissingValue):
                     out[entry] = False
@@ -2227,7 +2369,14 @@ class ConfigObj(Section):
         incorrect_sections = [k for k in configspec.sections if k in section.scalars]        
         incorrect_scalars = [k for k in configspec.scalars if k in section.sections]
         
+        if compiled:
+            ret_true, ret_false = self._validate_compiled(section, checks, out,
+                                                          validator, preserve_errors, copy)
+        
         for entry in configspec.scalars:
+            if compiled:
+                # done by _validate_compiled
+                break
             if entry in ('__many__', '___many___'):
                 # reserved names
                 continue
@@ -2252,9 +2401,14 @@ class ConfigObj(Section):
         
         many = None
         if '__many__' in configspec.scalars:
-            many = configspec['__many__']
+            many = '__many__'
         elif '___many___' in configspec.scalars:
-            many = configspec['___many___']
+            many = '___many___'
+        if many is not None:
+            if compiled:
+                many = checks[many]
+            else:
+                many = configspec[many]
         
         if many is not None:
             for entry in unvalidated:
@@ -2320,6 +2474,88 @@ class ConfigObj(Section):
         return out
 
 
+    def _validate_compiled(self, section, checks, out, validator,
+                           preserve_errors, copy):
+        """
+        Validate the scalars of ``section`` given in its configspec in a single
+        pass over their compiled ``checks``, see ``Validator.compile_section``.
+        
+        This does the same as ``validate_entry`` in ``validate`` for every
+        scalar, but reads and writes the values of the section directly. The
+        results are stored in ``out``, returns ``(ret_true, ret_false)``.
+        """
+        configspec = section.configspec
+        scalars = set(section.scalars)
+        defaults = set(section.defaults)
+        default_values = section.default_values
+        interpolation = self.interpolation
+        ret_true = ret_false = True
+        
+        for entry in configspec.scalars:
+            if entry in ('__many__', '___many___'):
+                # reserved names
+                continue
+            check = checks[entry]
+            missing = (entry not in scalars) or (entry in defaults)
+            if missing:
+                val = None
+                if copy and entry not in scalars:
+                    # copy comments
+                    section.comments[entry] = (
+                        configspec.comments.get(entry, []))
+                    section.inline_comments[entry] = (
+                        configspec.inline_comments.get(entry, ''))
+            else:
+                val = dict.__getitem__(section, entry)
+                if interpolation and (isinstance(val, list) or
+                                      '%' in val or '$' in val):
+                    # only these can change by interpolation
+                    val = section[entry]
+            
+            default_values.pop(entry, None)
+            try:
+                default_values[entry] = check.get_default_value()
+            except (KeyError, validator.baseErrorClass):
+                # no default or bad default
+                pass
+            
+            try:
+                value = check(val, missing=missing)
+            except validator.baseErrorClass, e:
+                if not preserve_errors or isinstance(e, self._vdtMissingValue):
+                    out[entry] = False
+                else:
+                    # preserve the error
+                    out[entry] = e
+                    ret_false = False
+                ret_true = False
+                continue
+            
+            ret_false = False
+            out[entry] = True
+            if missing:
+                if not self.stringify:
+                    if isinstance(value, (list, tuple)):
+                        # preserve lists
+                        value = [self._str(item) for item in value]
+                    elif value is None:
+                        # convert the None from a default to a ''
+                        value = ''
+                    else:
+                        value = self._str(value)
+                section[entry] = value
+                if not copy and entry not in section.defaults:
+                    section.defaults.append(entry)
+            elif self.stringify and value != val:
+                if isinstance(value, dict):
+                    section[entry] = value
+                else:
+                    # the entry exists, so this is all __setitem__ would do
+                    dict.__setitem__(section, entry, value)
+        
+        return ret_true, ret_false
+
+
     def reset(self):
         """Clear ConfigObj instance and restore to 'freshly created' state."""
         self.clear()
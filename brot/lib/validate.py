@@ -144,6 +144,7 @@ __all__ = (
     'VdtValueTooLongError',
     'VdtMissingValue',
     'Validator',
+    'CompiledCheck',
     'is_integer',
     'is_float',
     'is_boolean',
@@ -469,6 +470,70 @@ class VdtValueTooLongError(VdtValueError):
         ValidateError.__init__(self, 'the value "%s" is too long.' % (value,))
 
 
+class CompiledCheck(object):
+    """
+    A check parsed once, with its default value converted in advance.
+    
+    Calling it does the same as ``Validator.check`` and its
+    ``get_default_value`` method the same as ``Validator.get_default_value``,
+    without parsing the check again. Checks are compiled with the functions
+    registered at the time.
+    
+    >>> compiled = vtor.compile('integer(default=3)')
+    >>> compiled('5')
+    5
+    >>> compiled(None, missing=True)
+    3
+    >>> compiled.get_default_value()
+    3
+    """
+
+    def __init__(self, validator, check):
+        fun_name, fun_args, fun_kwargs, default = validator._parse_with_caching(check)
+        self.validator = validator
+        self.check = check
+        self.fun_name = fun_name
+        self.fun_args = fun_args
+        self.fun_kwargs = fun_kwargs
+        self.default = default
+        self.default_value = None
+        self.default_error = None
+        if default is not None:
+            try:
+                self.default_value = validator.get_default_value(check)
+            except ValidateError, e:
+                self.default_error = e
+
+
+    def __call__(self, value, missing=False):
+        if missing:
+            if self.default is None:
+                # no information needed here - to be handled by caller
+                raise VdtMissingValue()
+            return self.get_default_value()
+        
+        if value is None:
+            return None
+        
+        return self.validator._check_value(value, self.fun_name,
+                                           self.fun_args, self.fun_kwargs)
+
+
+    def get_default_value(self):
+        """
+        Return the default value of the check, raising a ``KeyError`` if it
+        has none, or the error converting it.
+        """
+        if self.default is None:
+            raise KeyError('Check "%s" has no default value.' % self.check)
+        if self.default_error is not None:
+            raise self.default_error
+        if isinstance(self.default_value, list):
+            # every section gets its own copy
+            return list(self.default_value)
+        return self.default_value
+
+
 class Validator(object):
     """
     Validator is an object that allows you to register a set of 'checks'.
@@ -588,6 +653,8 @@ class Validator(object):
         # tekNico: for use by ConfigObj
         self.baseErrorClass = ValidateError
         self._cache = {}
+        self._compiled = {}
+        self._compiled_sections = {}
 
 
     def check(self, check, value, missing=False):
@@ -625,6 +692,46 @@ class Validator(object):
         return self._check_value(value, fun_name, fun_args, fun_kwargs)
 
 
+    def compile(self, check):
+        """
+        Return the ``CompiledCheck`` of a check, which applies it without
+        parsing it again.
+        
+        >>> vtor.compile('integer(default=3)') is vtor.compile('integer(default=3)')
+        True
+        """
+        try:
+            return self._compiled[check]
+        except KeyError:
+            compiled = self._compiled[check] = CompiledCheck(self, check)
+            return compiled
+
+
+    def compile_section(self, configspec):
+        """
+        Return a dictionary of the ``CompiledCheck`` of every scalar of a
+        configspec section. It is made once for all the sections validated
+        against a configspec with the same checks, so changing a configspec
+        between validations is fine.
+        
+        >>> from configobj import ConfigObj
+        >>> spec = ConfigObj(['a = integer(default=1)'], list_values=False)
+        >>> vtor.compile_section(spec)['a'](None, missing=True)
+        1
+        >>> spec['a'] = 'integer(default=2)'
+        >>> vtor.compile_section(spec)['a'](None, missing=True)
+        2
+        """
+        # keyed by the checks themselves, as they are only strings
+        key = tuple([(entry, configspec[entry]) for entry in configspec.scalars])
+        try:
+            return self._compiled_sections[key]
+        except KeyError:
+            checks = self._compiled_sections[key] = dict(
+                [(entry, self.compile(check)) for entry, check in key])
+            return checks
+
+
     def _handle_none(self, value):
         if value == 'None':
             return None
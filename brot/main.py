@@ -9,15 +9,28 @@ import sys
 import copy
 import math
 import readline
-import itertools
-from array import array
+import hashlib
+import multiprocessing
+import multiprocessing.pool
 from collections import namedtuple
 
-# importing root functionality
-from ROOT import *
+# importing numpy for histogram arithmetic
+import numpy as np
+
+# importing root functionality, ROOT itself is only loaded on first use
+from lazyroot import ROOT
 
 # importing local libraries
 import style
+from filepool import FilePool
+from histcache import HistogramCache
+from catalog import Catalog
+from arraycache import ArrayCache
+from plotbook import PlotBook
+from canvaspool import CanvasPool
+from configsnapshot import ConfigSnapshot, file_digest
+from xsindex import XSIndex
+from histogram import Histogram, HistogramTensor
 from lib.configobj import ConfigObj
 from lib.validate import Validator
 
@@ -30,7 +43,19 @@ class Objects():
     validator   = Validator()
     def __init__(self):
         self.cfg         = None # config file
-        self.xs_cfg      = None # xs config parser
+        self.xs_cfg      = None # xs config of the samples in use
+        self.file_pool   = FilePool() # pool of open ROOT files
+        self.hist_cache  = HistogramCache() # cache of unscaled histograms
+        self.array_cache = ArrayCache() # on-disk cache of histograms as arrays
+        self.loader_pool = None # thread or process pool loading histograms
+        self.catalog     = None # catalog of the histograms in the analysis files
+        self.completer   = None # readline completer replaced by the histogram completion
+        self.saved_files = [] # files written by save()
+        self.file_reads  = 0  # number of analysis files read by fetch_histograms()
+        self.read_files  = set() # analysis files requested by read_histograms()
+        self.plot_book   = None # PlotBook receiving the saved plots as pages
+        self.canvas_pool = CanvasPool() # canvases reused by their size
+        self.samples     = [] # SampleRecord of every sample in config order
 
 objects = Objects()
 
@@ -60,7 +85,15 @@ class Settings():
         # bin width to which variable bins are normalized to
         # for values equal or less than 0.0, smallest bin width in histogram is used
         self.bin_normalization_width = 0.0
-        
+
+        # loading of histograms
+        self.loader             = "serial" # serial, thread or process loading
+        self.workers            = 4 # number of threads or processes loading histograms
+        self.cache_dir          = "cache/" # directory for indices and caches
+        self.array_cache        = False # load histograms from the on-disk array cache
+
+        # paths of the config, configspec and cross section files in use
+        self.config_files = []
 
 settings = Settings()
 
@@ -70,11 +103,29 @@ class Process():
     def __init__(self):
         self.path       = ""    # path to file
         self.label      = ""    # label of process
-        self.hist       = None  # TH1D histogram
+        self.hist       = None  # Histogram
+        self.draw_hist  = None  # TH1D or THStack drawn for the process
         self.style      = ""    # plotting style
         self.xs         = 0.    # cross section in pb
         self.nev        = 0     # number of events
         self.weight     = 0.    # weight/scale factor
+        self.scale      = 1.    # weight * xs * luminosity / nev, applied to simulated processes
+        self.fname      = ""    # name of the sample
+
+        # draw attributes, None keeps the ROOT default
+        self.fstyle     = None  # fill style
+        self.fcolor     = None  # fill color
+        self.lstyle     = None  # line style
+        self.lcolor     = None  # line color
+        self.mstyle     = None  # marker style
+        self.mcolor     = None  # marker color
+        self.msize      = None  # marker size
+
+
+# config of a sample compiled by compile_samples(), from which the processes are created
+SampleRecord = namedtuple("SampleRecord", ["category", "sample", "file_name", "label", "style",
+                                           "fstyle", "fcolor", "lstyle", "lcolor", "mstyle", "mcolor", "msize",
+                                           "xs", "nev", "weight", "scale"])
 
 
 # class containing the drawing objects and information of a ratio pad
@@ -89,11 +140,11 @@ class Ratio():
 # class containing the drawing objects and information of a pad
 class Pad():
     def reset(self):
-        # raw processes
-        self.raw_data           = []   # process : data
-        self.raw_backgrounds    = []   # process : background
-        self.raw_signals        = []   # process : signal
-        self.raw_systematics    = []   # process : systematic
+        # raw processes, as samples x bins tensors with the processes as records
+        self.raw_data           = None # HistogramTensor : data
+        self.raw_backgrounds    = None # HistogramTensor : background
+        self.raw_signals        = None # HistogramTensor : signal
+        self.raw_systematics    = None # HistogramTensor : systematic
 
         # composed, aka merged and ordered processes
         self.data                = None # process : data
@@ -101,8 +152,13 @@ class Pad():
         self.signals             = []   # process : signal
         self.systematics         = None # process : systematic
 
+        self.background_sum      = None # Histogram : sum of the backgrounds
+
         self.ordered_processes   = []   # order of plotting
 
+        self.composed            = False # composed processes are up to date with the raw ones
+        self.normalization       = 0.   # bin width the bin heights are normalized to, 0. if not normalized
+
         # misc drawing objects
         self.legend              = None # tlegend
         self.ratio               = None # Ratio : ratio object
@@ -136,14 +192,35 @@ def setup(config_file):
 
     print "Reading config file", config_file
 
-    # reading the plotting config file
-    objects.cfg = ConfigObj("../cfg/" + config_file, configspec = "../cfg/plot_spec.cfg")
-    # enter default values and check for errors
-    if not objects.cfg.validate(objects.validator):
+    # the snapshot of the validated configs lives in the default cache directory,
+    # as the configured one is not known before reading the config
+    config_path = "../cfg/" + config_file
+    spec_path = "../cfg/plot_spec.cfg"
+    snapshot = ConfigSnapshot(Settings().cache_dir + "config/" +
+                              hashlib.md5(os.path.realpath(config_path)).hexdigest() + ".pickle")
+    configs = snapshot.load()
+    if configs:
+        objects.cfg, objects.xs_cfg, valid = configs
+    else:
+        # reading the plotting config file
+        objects.cfg = ConfigObj(config_path, configspec = spec_path)
+        # enter default values and check for errors
+        valid = objects.cfg.validate(objects.validator)
+
+        # reading the cross sections of the samples in use from the indexed file
+        xs_path = "../cfg/" + objects.cfg["general"]["xs_file"]
+        xs_index = XSIndex(xs_path, objects.cfg["performance"]["cache_dir"] + "xs/" +
+                           hashlib.md5(os.path.realpath(xs_path)).hexdigest() + ".json")
+        xs_index.load()
+        objects.xs_cfg = xs_index.read(objects.cfg["backgrounds"].sections + objects.cfg["signals"].sections)
+        snapshot.save([config_path, spec_path, xs_path], objects.cfg, objects.xs_cfg, valid)
+
+    if not valid:
         print "Failed config file validation."
+    settings.config_files = [config_path, spec_path, "../cfg/" + objects.cfg["general"]["xs_file"]]
 
-    # reading the cross section config file
-    objects.xs_cfg = ConfigObj("../cfg/" + objects.cfg["general"]["xs_file"])
+    # compiling the samples
+    compile_samples()
 
     # reading base directory
     settings.base_dir = objects.cfg["general"]["base_dir"]
@@ -167,12 +244,42 @@ def setup(config_file):
 
     settings.bin_normalization_width = objects.cfg["switches"].as_float("bin_normalization_width")
 
+    # reading performance settings
+    objects.file_pool.max_open_files = objects.cfg["performance"].as_int("max_open_files")
+    objects.file_pool.evict()
+    objects.canvas_pool.max_canvases = objects.cfg["performance"].as_int("max_canvases")
+    objects.canvas_pool.evict()
+    objects.hist_cache.max_size = objects.cfg["performance"].as_float("cache_size")
+    objects.hist_cache.evict()
+    settings.loader = objects.cfg["performance"]["loader"]
+    settings.workers = objects.cfg["performance"].as_int("workers")
+    settings.cache_dir = objects.cfg["performance"]["cache_dir"]
+    settings.array_cache = objects.cfg["performance"].as_bool("array_cache")
+    objects.array_cache = ArrayCache(settings.cache_dir)
+    close_loader_pool()
+
+
+
+def configure_root():
+    """Global ROOT settings, applied as soon as ROOT is loaded."""
+
     # enable quadratic uncertainty handling
-    TH1.SetDefaultSumw2(True)
-    TH2.SetDefaultSumw2(True)
-    TH3.SetDefaultSumw2(True)
+    ROOT.TH1.SetDefaultSumw2(True)
+    ROOT.TH2.SetDefaultSumw2(True)
+    ROOT.TH3.SetDefaultSumw2(True)
+
+    ROOT.SetMemoryPolicy(ROOT.kMemoryHeuristics)
+
+ROOT.on_load(configure_root)
+
 
-    SetMemoryPolicy(kMemoryHeuristics)
+
+def config_digests():
+    """Returns the md5 hashes of the config, configspec and cross section files
+    in use as a dictionary path : hash, which changes whenever any of them
+    changes."""
+
+    return dict((file_path, file_digest(file_path)) for file_path in settings.config_files)
 
 
 
@@ -181,13 +288,14 @@ def selection(analysis_directory):
 
     print "Working in sub-directory", analysis_directory
     settings.ana_dir = analysis_directory
+    objects.catalog = None
 
 
 
 def brot_init():
     """Initialize default settings for the bROT package."""
 
-    style.set_tdr_style() # using TDR style for plotting
+    ROOT.on_load(style.set_tdr_style) # using TDR style for plotting, once ROOT is loaded
     setup("plot.cfg") # setup using the default plot.cfg
     selection("pytest")
 
@@ -208,23 +316,19 @@ def clear_and_prepare_pads(max_pad_number):
 
         
 def create_canvas(divide_x = 1, divide_y = 1):
-    """Create a canvas and divide it according to divide_x and divide_y. Default values are 1, 1."""
+    """Create a canvas and divide it according to divide_x and divide_y. Default values are 1, 1.
+    Canvases are taken from the canvas pool, which reuses canvases of the same size."""
 
     # check for number of sub-canvases
-    if (divide_x > 3 or divide_y > 2):
-        print "Maximal amount of sub-canvases: 3x2"
+    if (divide_x < 1 or divide_y < 1):
+        print "Minimal amount of sub-canvases: 1x1"
         return
 
-    # destroy old canvas
-    if canvas.canvas:
-       canvas.canvas = None
-
-    # create canvas (used globally)
+    # take canvas from the pool (used globally)
     x_size = 850 * divide_x
     y_size = 600 * divide_y
-    canvas.canvas = TCanvas("gCanvas", "Analysis", 0, 0, x_size, y_size)
+    canvas.canvas = objects.canvas_pool.get(divide_x, divide_y, x_size, y_size)
 
-    canvas.canvas.Divide(divide_x, divide_y)
     canvas.canvas.cd(1)
     canvas.pad_nr = 0 # cd - 1 to start lists at [0]
     canvas.max_pad_nr = divide_x * divide_y
@@ -234,122 +338,396 @@ def create_canvas(divide_x = 1, divide_y = 1):
 
 
 
-def read_histogram(file_name, histogram_name):
-    """Read a single histogram with the name histogram_name from the analysis.
-    Function is called by read_histograms()."""
+def histogram_path(file_name):
+    """Returns the path of the analysis file file_name."""
+
+    return settings.base_dir + settings.ana_dir + "/" + settings.file_dir + file_name
 
-    file_path = settings.base_dir + settings.ana_dir + "/" + settings.file_dir + file_name
 
-    if os.path.exists(file_path):
-        t_file = TFile(file_path)
-        histo = t_file.Get("h1_0_" + histogram_name)
+
+def load_histograms(file_path, histogram_names):
+    """Load the histograms histogram_names from the file at file_path, opening
+    the file only once and without using the histogram cache. Function is
+    called by read_histograms() and read_many()."""
+
+    if not os.path.exists(file_path):
+        print "Could not find file", file_path
+        return [None] * len(histogram_names)
+
+    # files are only closed once all workers are done
+    t_file = objects.file_pool.get(file_path, evict = settings.loader == "serial")
+    if not t_file:
+        return [None] * len(histogram_names)
+
+    histograms = []
+    for histogram_name in histogram_names:
+        histo = t_file.Get(settings.hist_prefix + histogram_name)
         if histo:
             histo.SetDirectory(0) # detach histogram from file, otherwise gc will collect
-            return histo
+            histograms.append(Histogram.from_th1(histo))
         else:
-            print "File", file_name, "\n does not contain histogram", histogram_name
+            print "File", os.path.basename(file_path), "\n does not contain histogram", histogram_name
+            histograms.append(None)
+
+    return histograms
+
+
+
+def load_histograms_job(job):
+    """Unpacks a (file_path, histogram_names) job for the loader pool."""
+
+    return load_histograms(*job)
+
+
+
+def init_loader_process():
+    """Give each loader process its own file handles instead of sharing the
+    ones inherited from the parent process."""
+
+    objects.file_pool = FilePool(objects.file_pool.max_open_files)
+
+
+
+def create_loader_pool():
+    """Create the thread or process pool used to load histograms in parallel."""
+
+    if settings.loader == "thread":
+        if hasattr(ROOT, "EnableThreadSafety"):
+            ROOT.EnableThreadSafety()
+        objects.loader_pool = multiprocessing.pool.ThreadPool(settings.workers)
+
+    elif settings.loader == "process":
+        objects.loader_pool = multiprocessing.Pool(settings.workers, init_loader_process)
+
+    return objects.loader_pool
+
+
+
+def close_loader_pool():
+    """Terminate the workers of the loader pool."""
+
+    if objects.loader_pool:
+        objects.loader_pool.terminate()
+        objects.loader_pool = None
+
+
+
+def map_jobs(function, jobs):
+    """Apply function to all jobs, using the loader pool if settings.loader is
+    'thread' or 'process'. The results are returned in the order of the jobs."""
+
+    if settings.loader == "serial" or len(jobs) < 2:
+        return map(function, jobs)
+
+    results = (objects.loader_pool or create_loader_pool()).map(function, jobs)
+    objects.file_pool.evict()
+    return results
+
+
+
+def fetch_histograms(jobs):
+    """Load the histograms of the (file_path, histogram_names) jobs from the
+    array cache, if it is enabled, or from the analysis files. Function is
+    called by read_histograms() and read_many()."""
+
+    objects.file_reads += len(jobs)
+    if not settings.array_cache:
+        return map_jobs(load_histograms_job, jobs)
+
+    # convert the files which changed since the last conversion
+    objects.array_cache.update([file_path for file_path, histogram_names in jobs
+                                if os.path.exists(file_path)], map_jobs)
+
+    results = []
+    for file_path, histogram_names in jobs:
+        if not os.path.exists(file_path):
+            print "Could not find file", file_path
+            results.append([None] * len(histogram_names))
+            continue
+
+        if file_path not in objects.array_cache.samples:
+            # the conversion failed, read the analysis file itself
+            results.append(load_histograms(file_path, histogram_names))
+            continue
+
+        histograms = []
+        for histogram_name in histogram_names:
+            histo = objects.array_cache.get(file_path, settings.hist_prefix + histogram_name)
+            if not histo:
+                print "File", os.path.basename(file_path), "\n does not contain histogram", histogram_name
+            histograms.append(histo)
+        results.append(histograms)
+
+    return results
+
+
+
+def compile_samples():
+    """Compiles the config of every sample once into a SampleRecord holding its
+    label, draw attributes and the factor scaling it to the luminosity, which
+    is summed up from the data samples. Called by setup()."""
+
+    settings.luminosity = sum(objects.cfg["data"][data].as_float("luminosity")
+                              for data in objects.cfg["data"].sections)
+
+    samples = []
+    data = objects.cfg["data"]
+    for sample in data.sections:
+        samples.append(SampleRecord("data", sample, sample + ".root", data["label"], "E",
+                                    data.as_int("fstyle"), data.as_int("fcolor"),
+                                    data.as_int("lstyle"), data.as_int("lcolor"),
+                                    data.as_int("mstyle"), data.as_int("mcolor"), data.as_float("msize"),
+                                    0., 0, 0., 1.))
+
+    for category in ["backgrounds", "signals"]:
+        for sample in objects.cfg[category].sections:
+            if sample not in objects.xs_cfg:
+                print "No cross section found for sample", sample
+                continue
+
+            section = objects.cfg[category][sample]
+            xs = objects.xs_cfg[sample].as_float("xs")
+            weight = objects.xs_cfg[sample].as_float("weight")
+            nev = objects.xs_cfg[sample].as_int("Nev")
+            samples.append(SampleRecord(category, sample, sample + ".root", section["label"], "HIST",
+                                        section.as_int("fstyle"), section.as_int("fcolor"),
+                                        # backgrounds are outlined in their fill color
+                                        section.as_int("lstyle"),
+                                        section.as_int("fcolor" if category == "backgrounds" else "lcolor"),
+                                        section.as_int("mstyle"), section.as_int("mcolor"), section.as_float("msize"),
+                                        xs, nev, weight, weight * xs * settings.luminosity / nev))
+
+    systematics = objects.cfg["systematics"]
+    for sample in systematics.sections:
+        samples.append(SampleRecord("systematics", sample, sample + ".root", systematics["label"], "E2",
+                                    systematics.as_int("fstyle"), systematics.as_int("fcolor"),
+                                    None, None, None, None, None, 0., 0, 0., 1.))
+
+    objects.samples = samples
+
+
+
+def create_process(record, hist):
+    """Creates the process of the sample record with the histogram hist."""
+
+    proc        = Process()
+    proc.label  = record.label
+    proc.style  = record.style
+    proc.fname  = record.sample
+    proc.hist   = hist
+    proc.fstyle = record.fstyle
+    proc.fcolor = record.fcolor
+    proc.lstyle = record.lstyle
+    proc.lcolor = record.lcolor
+    proc.mstyle = record.mstyle
+    proc.mcolor = record.mcolor
+    proc.msize  = record.msize
+    proc.xs     = record.xs
+    proc.nev    = record.nev
+    proc.weight = record.weight
+    proc.scale  = record.scale
+    return proc
+
+
+
+def list_samples():
+    """Returns the (category, sample) pairs of all processes in config order."""
+
+    return [(record.category, record.sample) for record in objects.samples]
+
+
+
+def read_histograms(file_names, histogram_name):
+    """Read the histogram histogram_name from each of the files file_names.
+    Histograms that have been read before are copied from the histogram cache,
+    the others are loaded from the array cache or by the loader pool if
+    settings.loader is 'thread' or 'process'. The histograms are returned in
+    the order of file_names."""
+
+    file_paths = [histogram_path(file_name) for file_name in file_names]
+    objects.read_files.update(file_paths)
+
+    # serve as many histograms as possible from the cache
+    histograms = []
+    missing = []
+    for i, file_path in enumerate(file_paths):
+        histo = None
+        if os.path.exists(file_path):
+            histo = objects.hist_cache.get(file_path, histogram_name)
+        if not histo:
+            missing.append(i)
+        histograms.append(histo)
+
+    # load the remaining histograms from the files
+    jobs = [(file_paths[i], [histogram_name]) for i in missing]
+    for i, (histo,) in zip(missing, fetch_histograms(jobs)):
+        if histo:
+            objects.hist_cache.put(file_paths[i], histogram_name, histo)
+        histograms[i] = histo
+
+    return histograms
+
+
+
+def read_many(histogram_names):
+    """Read the histograms histogram_names of all processes into the histogram
+    cache, opening each analysis file only once. Subsequent calls of plot()
+    take the histograms from the cache."""
+
+    if objects.cfg is None:
+        print "No config file loaded! Use setup('canvas.cfg')"
+        return
+
+    # only read histograms, which are not cached yet
+    jobs = []
+    for category, sample in list_samples():
+        file_path = histogram_path(sample + ".root")
+        if not os.path.exists(file_path):
+            print "Could not find file", file_path
+            continue
+
+        missing = [name for name in histogram_names if not objects.hist_cache.contains(file_path, name)]
+        if missing:
+            jobs.append((file_path, missing))
+
+    for (file_path, missing), histograms in zip(jobs, fetch_histograms(jobs)):
+        for histogram_name, histo in zip(missing, histograms):
+            if histo:
+                objects.hist_cache.put(file_path, histogram_name, histo)
+
+    if objects.hist_cache.size > objects.hist_cache.max_size * 1024 * 1024 * 0.9:
+        print "Histogram cache is almost full, consider increasing cache_size."
+
+
+
+def read_histogram(file_name, histogram_name):
+    """Read a single histogram with the name histogram_name from the analysis.
+    Histograms that have been read before are copied from the histogram cache."""
+
+    return read_histograms([file_name], histogram_name)[0]
+
+
+
+def get_catalog():
+    """Returns the catalog of the histograms in the current analysis directory.
+    It is loaded from disk on first use and the files that changed since the
+    last scan are scanned again."""
+
+    if objects.catalog is None:
+        directory = settings.base_dir + settings.ana_dir + "/" + settings.file_dir
+        if not os.path.exists(directory):
+            print "Path", directory, "does not exist!"
             return None
 
-    else:
-        print "Could not find file", file_path
-        return None
+        index_path = (settings.cache_dir + "catalog/" +
+                      hashlib.md5(os.path.realpath(directory)).hexdigest() + ".json")
+        objects.catalog = Catalog(directory, index_path)
+        objects.catalog.load()
+        update_catalog()
+        install_completer()
+
+    return objects.catalog
+
+
+
+def update_catalog():
+    """Scans the analysis files which changed since the last scan and adds
+    them to the catalog."""
+
+    if objects.catalog is None:
+        get_catalog()
+        return
 
+    scanned = objects.catalog.update(map_jobs)
+    if scanned:
+        print "Scanned", scanned, "files for histograms."
 
 
-def read_processes(histogram_name):
-    """Read the histograms called histogram_name from the analysis files."""
+
+def has_histogram(histogram_name):
+    """Returns whether any analysis file contains the histogram histogram_name."""
+
+    catalog = get_catalog()
+    return bool(catalog and catalog.get(settings.hist_prefix + histogram_name))
+
+
+
+def list_histograms(pattern = "*"):
+    """Prints and returns the names of all histograms matching the shell-style
+    pattern, e.g. list_histograms("*pt*")."""
+
+    catalog = get_catalog()
+    if not catalog:
+        return []
+
+    names = [name[len(settings.hist_prefix):]
+             for name in catalog.names(settings.hist_prefix + pattern)]
+    for name in names:
+        entry = catalog.get(settings.hist_prefix + name)
+        print "{0:40} {1:6} {2:5d} bins [{3:g}, {4:g}] in {5} files".format(
+            name, entry.class_name, entry.nbins, entry.xmin, entry.xmax, len(entry.samples))
+    return names
+
+
+
+def complete_histogram(text, state):
+    """Completes histogram names inside of quotes, e.g. plot("..."), and falls
+    back to the previous completer otherwise."""
+
+    line = readline.get_line_buffer()[:readline.get_begidx()]
+    if objects.catalog and line.count('"') % 2 == 1:
+        names = [name[len(settings.hist_prefix):]
+                 for name in objects.catalog.names(settings.hist_prefix + text + "*")]
+        return names[state] if state < len(names) else None
+
+    if objects.completer:
+        return objects.completer(text, state)
+    return None
+
+
+
+def install_completer():
+    """Enables the completion of histogram names."""
+
+    if readline.get_completer() is not complete_histogram:
+        objects.completer = readline.get_completer()
+        readline.set_completer(complete_histogram)
+
+
+
+def read_processes(histogram_name, pad = None):
+    """Read the histograms called histogram_name from the analysis files into
+    the given Pad, by default the current one."""
+
+    if pad is None:
+        pad = pads[canvas.pad_nr]
 
     dir_path = settings.base_dir + settings.ana_dir + "/"
     if not os.path.exists(dir_path):
         print "Path", dir_path, " does not exist!"
         return
 
-    # loop over data histograms and sum up luminosities
-    settings.luminosity = 0.
-    for data in objects.cfg["data"].sections:
-        # normalize to sum of lumi of all given data
-        settings.luminosity += objects.cfg["data"][data].as_float("luminosity")
-        hist = read_histogram(data + ".root", histogram_name)
-        if hist:
-            hist.SetFillStyle  (objects.cfg["data"].as_int("fstyle"))
-            hist.SetFillColor  (objects.cfg["data"].as_int("fcolor"))
-            hist.SetLineStyle  (objects.cfg["data"].as_int("lstyle"))
-            hist.SetLineColor  (objects.cfg["data"].as_int("lcolor"))
-            hist.SetMarkerStyle(objects.cfg["data"].as_int("mstyle"))
-            hist.SetMarkerColor(objects.cfg["data"].as_int("mcolor"))
-            hist.SetMarkerSize (objects.cfg["data"].as_float("msize"))
-
-            proc        = Process()
-            proc.style  = "E"
-            proc.hist   = hist
-            proc.fname  = data
-            proc.label  = objects.cfg["data"]["label"]
-
-            pads[canvas.pad_nr].raw_data.append(proc)
-
-
-    # loop over backgrounds and load histograms
-    for background in objects.cfg["backgrounds"].sections:
-        hist = read_histogram(background + ".root", histogram_name)
-        if hist:
-            hist.SetFillStyle  (objects.cfg["backgrounds"][background].as_int("fstyle"))
-            hist.SetFillColor  (objects.cfg["backgrounds"][background].as_int("fcolor"))
-            hist.SetLineStyle  (objects.cfg["backgrounds"][background].as_int("lstyle"))
-            hist.SetLineColor  (objects.cfg["backgrounds"][background].as_int("fcolor"))
-            hist.SetMarkerStyle(objects.cfg["backgrounds"][background].as_int("mstyle"))
-            hist.SetMarkerColor(objects.cfg["backgrounds"][background].as_int("mcolor"))
-            hist.SetMarkerSize (objects.cfg["backgrounds"][background].as_float("msize"))
-
-            proc        = Process()
-            proc.hist   = hist
-            proc.style  = "HIST"
-            proc.fname  = background
-            proc.label  = objects.cfg["backgrounds"][background]["label"]
-            proc.xs     = objects.xs_cfg[background].as_float("xs")
-            proc.weight = objects.xs_cfg[background].as_float("weight")
-            proc.nev    = objects.xs_cfg[background].as_int("Nev")
-            proc.hist.Scale(proc.weight * proc.xs * settings.luminosity / proc.nev)
-
-            pads[canvas.pad_nr].raw_backgrounds.append(proc)
-
-    # loop over signals and load histograms
-    for signal in objects.cfg["signals"].sections:
-        hist = read_histogram(signal + ".root", histogram_name)
-        if hist:
-            hist.SetFillStyle  (objects.cfg["signals"][signal].as_int("fstyle"))
-            hist.SetFillColor  (objects.cfg["signals"][signal].as_int("fcolor"))
-            hist.SetLineStyle  (objects.cfg["signals"][signal].as_int("lstyle"))
-            hist.SetLineColor  (objects.cfg["signals"][signal].as_int("lcolor"))
-            hist.SetMarkerStyle(objects.cfg["signals"][signal].as_int("mstyle"))
-            hist.SetMarkerColor(objects.cfg["signals"][signal].as_int("mcolor"))
-            hist.SetMarkerSize (objects.cfg["signals"][signal].as_float("msize"))
-
-            proc        = Process()
-            proc.hist   = hist
-            proc.style  = "HIST"
-            proc.fname  = signal
-            proc.label  = objects.cfg["signals"][signal]["label"]
-            proc.xs     = objects.xs_cfg[signal].as_float("xs")
-            proc.weight = objects.xs_cfg[signal].as_float("weight")
-            proc.nev    = objects.xs_cfg[signal].as_int("Nev")
-            proc.hist.Scale(proc.weight * proc.xs * settings.luminosity / proc.nev)
-
-            pads[canvas.pad_nr].raw_signals.append(proc)
-
-    # loop over systematics and load histograms
-    for systematic in objects.cfg["systematics"].sections:
-        hist = read_histogram(systematic + ".root", histogram_name)
-        if hist:
-            hist.SetFillStyle  (objects.cfg["systematics"].as_int("fstyle"))
-            hist.SetFillColor  (objects.cfg["systematics"].as_int("fcolor"))
-            
-            proc        = Process()
-            proc.hist   = hist
-            proc.style  = "E2"
-            proc.fname  = systematic
-            proc.label  = objects.cfg["systematics"]["label"]
-            
-            pads[canvas.pad_nr].raw_systematics.append(proc)
+    # read the histograms of all processes at once, keeping the config order
+    histograms = read_histograms([record.file_name for record in objects.samples], histogram_name)
+
+    processes = {"data" : [], "backgrounds" : [], "signals" : [], "systematics" : []}
+    reference = None # (sample, bin edges) all histograms are stacked with
+    for record, hist in zip(objects.samples, histograms):
+        if not hist:
+            continue
+        if reference is None:
+            reference = (record.sample, hist.edges)
+        elif not np.array_equal(hist.edges, reference[1]):
+            print "Binning of histogram", histogram_name, "in sample", record.sample,
+            print "does not match sample", reference[0] + ", skipping the sample."
+            continue
+        processes[record.category].append(create_process(record, hist))
+
+    # stack the histograms and normalize the simulated processes to the luminosity
+    pad.raw_data = create_tensor(processes["data"])
+    pad.raw_backgrounds = create_tensor(processes["backgrounds"], True)
+    pad.raw_signals = create_tensor(processes["signals"], True)
+    pad.raw_systematics = create_tensor(processes["systematics"])
 
 
 
@@ -372,51 +750,44 @@ def delete_pad_objects():
 
 
 
-def order_processes(process_list):
-    """Order the list of processes by the integral of their histogram."""
+def create_tensor(process_list, scale = False):
+    """Stack the histograms of the processes into one HistogramTensor, which
+    keeps the processes as records of its rows. If scale is True, every row is
+    scaled by the scale factor of its process."""
 
-    return sorted(process_list, key=lambda proc: proc.hist.Integral())
+    if not process_list:
+        return None
 
+    tensor = HistogramTensor.from_histograms(process_list, [process.hist for process in process_list])
+    for process in process_list:
+        process.hist = None # the tensor holds the histograms from now on
 
+    if scale:
+        tensor.scale_rows([process.scale for process in process_list])
+    return tensor
 
-def merge_processes(process_list, style="linear"):
-    """Merge the processes that carry the same label."""
 
-    joined_processes = []
 
-    while process_list:
-        # take the current label
-        hist = process_list[0].hist.Clone()
-        hist.SetName(hist.GetName())#+str(id(hist)))
-        label = process_list[0].label
+def tensor_processes(tensor):
+    """Returns copies of the processes of the tensor rows, carrying the
+    histograms of their rows."""
 
-        # loop over remaining process_list and add the ones with the same labels
-        for j in range(1, len(process_list)):
-            if process_list[j].label == label:
+    processes = []
+    for row, record in enumerate(tensor.records):
+        process = copy.copy(record)
+        process.hist = tensor.histogram(row)
+        processes.append(process)
 
-                # add the bin contents linearly
-                if style == "linear":
-                    hist.Add(process_list[j].hist)
+    return processes
 
-                # add the bin contents quadratically
-                if style == "quadratic":
-                    for i in range(1, hist.GetXaxis().GetNbins()):
-                        hist.SetBinContent(i, sqrt(pow(hist.GetBinContent(i), 2) +
-                                                   pow(process_list[j].hist.GetBinContent(i), 2)))
-                        
-                # remove added background
-                process_list.pop(j)
 
-        # create a copy of the process and set its histogram to the cloned one
-        process_copy = copy.copy(process_list[0])
-        process_copy.hist = hist
 
-        # append the joined process to the list
-        joined_processes.append(process_copy)
-        # remove the joined process
-        process_list.pop(0)
+def merge_processes(process_list, style="linear"):
+    """Merge the processes that carry the same label. The merged processes keep
+    the order in which their labels appear first."""
 
-    return joined_processes
+    tensor = HistogramTensor.from_histograms(process_list, [process.hist for process in process_list])
+    return tensor_processes(tensor.merge(style))
 
 
 
@@ -426,16 +797,15 @@ def stack_processes(process_list):
     # if there are actually any processes ...
     if process_list:
         # add the histograms to a THStack and save it in the plot class
-        process_stack = THStack(process_list[0].hist.GetName(), process_list[0].hist.GetName()) #"stack" + str(id(process_list[0].hist)),
-                                #"stack" + str(id(process_list[0].hist)))
+        process_stack = ROOT.THStack(process_list[0].hist.name, process_list[0].hist.name)
         for process in process_list:
-            process_stack.Add(process.hist)
+            process_stack.Add(process.draw_hist)
             
         return process_stack
 
     # else return empy stack
     print "Warning! THStack is empty!"
-    return THStack()
+    return ROOT.THStack()
 
 
 
@@ -448,46 +818,41 @@ def rebin(bins):
         print "Cannot call rebin() when showing the systematics."
         return
     
-    # merge bins
-    if type(bins) is int:
-        for process in list(itertools.chain(pads[canvas.pad_nr].raw_data,
-                                        pads[canvas.pad_nr].raw_backgrounds,
-                                        pads[canvas.pad_nr].raw_signals)):
-            process.hist.Rebin(bins)
-
-        # redraw processes
-        draw_processes()
+    # rebin all tensors before replacing any of them
+    try:
+        raw_data, raw_backgrounds, raw_signals = [tensor.rebin(bins) if tensor else None for tensor in
+                                                  [pads[canvas.pad_nr].raw_data,
+                                                   pads[canvas.pad_nr].raw_backgrounds,
+                                                   pads[canvas.pad_nr].raw_signals]]
+    except ValueError as error:
+        print error
+        return
+
+    pads[canvas.pad_nr].raw_data = raw_data
+    pads[canvas.pad_nr].raw_backgrounds = raw_backgrounds
+    pads[canvas.pad_nr].raw_signals = raw_signals
+    pads[canvas.pad_nr].composed = False
 
     # variable binning
     if type(bins) is list:
-        for process in list(itertools.chain(pads[canvas.pad_nr].raw_data,
-                                        pads[canvas.pad_nr].raw_backgrounds,
-                                        pads[canvas.pad_nr].raw_signals)):
-
-            # replace old histograms
-            process.hist = process.hist.Rebin(int(len(bins)-1), # arraylength - 1
-                                              process.hist.GetName(), # new name of histogram
-                                              array("d", bins)) # array of bin (lower) edges
-
-        # create merged processes
-        order_all_processes()
         # scales bin heights if bin widths are variable
         scale_bin_heights()
-        # redraw
-        draw()
+
+    # redraw processes
+    draw_processes()
 
 
 
 def update_pad():
     """Updates the pad and redraws the axis"""
 
-    if not gPad:
+    if not ROOT.gPad:
         print "No active pad."
         return
 
-    gPad.Modified()
-    gPad.Update()
-    gPad.RedrawAxis()
+    ROOT.gPad.Modified()
+    ROOT.gPad.Update()
+    ROOT.gPad.RedrawAxis()
 
 
 
@@ -495,7 +860,7 @@ def get_draw_object():
     """Returns the object, which was drawn first and therefore drew the axis etc."""
 
     if pads[canvas.pad_nr].ordered_processes:
-        return pads[canvas.pad_nr].ordered_processes[0].hist
+        return pads[canvas.pad_nr].ordered_processes[0].draw_hist
     
     # if nothing is being drawn, return None
     return None
@@ -518,7 +883,7 @@ def ymin(minimum_value):
     # has to be set for all draw objects to prevent error messages when turning
     # axis logarithmic
     for process in pads[canvas.pad_nr].ordered_processes:
-        process.hist.SetMinimum(minimum_value)
+        process.draw_hist.SetMinimum(minimum_value)
     update_pad()
 
 
@@ -536,11 +901,11 @@ def zoom(minimum_value, maximum_value):
 def logy(set_logy = True):
     """Sets the scale of current pad to logarithmic."""
 
-    if gPad:
+    if ROOT.gPad:
         cd(canvas.pad_nr + 1)
         # if get_draw_object().GetMinimum() <= 0:
         # TODO
-        gPad.SetLogy(set_logy)
+        ROOT.gPad.SetLogy(set_logy)
         draw_processes()
         update_pad()
 
@@ -558,7 +923,7 @@ def set_text_style(tlatex, size = 0.05):
 def cms_text(position = "top", additional_text = ""):
     """Draws the luminosity and CMS text."""
 
-    if not gPad:
+    if not ROOT.gPad:
         print "No pad."
         return
 
@@ -570,7 +935,7 @@ def cms_text(position = "top", additional_text = ""):
         del pads[canvas.pad_nr].latex[:]
 
     # luminosity text on the top right
-    right_text = TLatex(0.74, 0.955, "{0:.1f}".format(settings.luminosity/1000) + " fb^{-1} (8 TeV)" )
+    right_text = ROOT.TLatex(0.74, 0.955, "{0:.1f}".format(settings.luminosity/1000) + " fb^{-1} (8 TeV)" )
     #"#lower[-0.05]{#scale[0.5]{#int}} L #lower[-0.1]{=} %.1f fb^{-1}  #sqrt{s} = 8 TeV" %(settings.luminosity/1000) )
     set_text_style(right_text, 0.04)
     right_text.Draw()
@@ -580,7 +945,7 @@ def cms_text(position = "top", additional_text = ""):
     cms_x = 0.16
     cms_y = 0.955
     if position == "top":
-        cms_text = TLatex(cms_x, cms_y, "#font[62]{CMS} #scale[0.8]{#font[52]{" + settings.cms_text + "}}   #scale[0.8]{" + additional_text + "}")
+        cms_text = ROOT.TLatex(cms_x, cms_y, "#font[62]{CMS} #scale[0.8]{#font[52]{" + settings.cms_text + "}}   #scale[0.8]{" + additional_text + "}")
         set_text_style(cms_text)
         cms_text.Draw()
 
@@ -598,9 +963,9 @@ def cms_text(position = "top", additional_text = ""):
         cms_x = 0.74
         cms_y = 0.87
 
-    cms_text  = TLatex(cms_x, cms_y, "#font[62]{CMS}")
-    cms_text2 = TLatex(cms_x, cms_y - 0.05, "#scale[0.8]{#font[52]{" + settings.cms_text + "}}")
-    cms_text3 = TLatex(cms_x, cms_y - 0.13, "#scale[0.8]{" + additional_text + "}")
+    cms_text  = ROOT.TLatex(cms_x, cms_y, "#font[62]{CMS}")
+    cms_text2 = ROOT.TLatex(cms_x, cms_y - 0.05, "#scale[0.8]{#font[52]{" + settings.cms_text + "}}")
+    cms_text3 = ROOT.TLatex(cms_x, cms_y - 0.13, "#scale[0.8]{" + additional_text + "}")
 
     set_text_style(cms_text)
     set_text_style(cms_text2)
@@ -661,7 +1026,7 @@ def filter_by_bin_height(minimum_bin_height, processes):
 
     valid_processes = []
     for process in processes:
-        if not process.hist.GetBinContent(process.hist.GetMaximumBin()) < minimum_bin_height:
+        if not process.hist.maximum() < minimum_bin_height:
             valid_processes.append(process)
 
     return valid_processes
@@ -696,23 +1061,23 @@ def legend(minimum_bin_height = 1e-3, number_of_columns = 1, x1 = None, y1 = Non
         size_per_entry = 0.08
         y2 -= size_per_entry * (len(backgrounds) + len(signals) + (1 if data else 0))
 
-    legend = TLegend(x1, y1, x2, y2)
+    legend = ROOT.TLegend(x1, y1, x2, y2)
 
     # take the ordered backgrounds
     for background in backgrounds[::-1]:
-        legend.AddEntry(background.hist, background.label, "f")
+        legend.AddEntry(background.draw_hist, background.label, "f")
 
-    if systematics:
-        legend.AddEntry(systematics.hist, systematics.label, "f")
+    if systematics and systematics.draw_hist:
+        legend.AddEntry(systematics.draw_hist, systematics.label, "f")
     
     if data:
-        legend.AddEntry(data.hist, data.label, "pe")
+        legend.AddEntry(data.draw_hist, data.label, "pe")
 
     for signal in signals[::-1]:
-        legend.AddEntry(signal.hist, signal.label, "l")
+        legend.AddEntry(signal.draw_hist, signal.label, "l")
 
     # legend settings and drawing
-    legend.SetFillColor(kWhite)
+    legend.SetFillColor(ROOT.kWhite)
     legend.SetFillStyle(0)
     legend.SetBorderSize(0)
     legend.SetTextFont(42)
@@ -723,23 +1088,11 @@ def legend(minimum_bin_height = 1e-3, number_of_columns = 1, x1 = None, y1 = Non
 
 
 
-def accumulate_histogram(histogram):
-    """Transforms one histogram into a cumulative distribution."""
-
-    for i in range(1, histogram.GetXaxis().GetNbins()):
-        integral_error = Double(0)
-        integral = histogram.IntegralAndError(i,
-                                              histogram.GetXaxis().GetNbins(),
-                                              integral_error)
-
-        histogram.SetBinContent(i, integral)
-        histogram.SetBinError(i, integral_error)
-
-
-
-def cumulative():
+def cumulative(forward = False, overflow = False):
     """Takes the histograms of the current pad transforms them into cumulative
-    distributions."""
+    distributions. By default every bin holds the sum of itself and all bins
+    above, with forward = True the sum of itself and all bins below. With
+    overflow = True, the overflow, or underflow respectively, is included."""
 
     if not get_draw_object():
         print "Use plot(histogram_name) first."
@@ -749,29 +1102,74 @@ def cumulative():
         print "Cannot call cumulative() when showing the systematics."
         return
 
-    for process in list(itertools.chain(pads[canvas.pad_nr].raw_data,
-                                        pads[canvas.pad_nr].raw_backgrounds,
-                                        pads[canvas.pad_nr].raw_signals)):
-        accumulate_histogram(process.hist)
+    for tensor in [pads[canvas.pad_nr].raw_data,
+                   pads[canvas.pad_nr].raw_backgrounds,
+                   pads[canvas.pad_nr].raw_signals]:
+        if tensor:
+            tensor.cumulative(forward, overflow)
+    pads[canvas.pad_nr].composed = False
 
     draw_processes()
 
 
 
-def order_all_processes():
-    """Merges and orderes processes and stores them in the pads class."""
+def order_all_processes(pad = None):
+    """Merges and orderes processes and stores them in the given Pad, by default
+    the current one."""
 
-    if pads[canvas.pad_nr].raw_backgrounds:
-        pads[canvas.pad_nr].backgrounds = order_processes(merge_processes(list(pads[canvas.pad_nr].raw_backgrounds)))
-    
-    if pads[canvas.pad_nr].raw_data:
-        pads[canvas.pad_nr].data = merge_processes(list(pads[canvas.pad_nr].raw_data))[0]
+    if pad is None:
+        pad = pads[canvas.pad_nr]
 
-    if pads[canvas.pad_nr].raw_signals:
-        pads[canvas.pad_nr].signals = order_processes(list(pads[canvas.pad_nr].raw_signals))
+    # merge and order the tensors
+    data = backgrounds = signals = None
+    if pad.raw_backgrounds:
+        backgrounds = pad.raw_backgrounds.merge().ordered()
 
-    if pads[canvas.pad_nr].raw_systematics:
-        pads[canvas.pad_nr].systematics = merge_processes(list(pads[canvas.pad_nr].raw_systematics), "quadratic")[0]
+    if pad.raw_data:
+        data = pad.raw_data.merge()
+
+    if pad.raw_signals:
+        signals = pad.raw_signals.ordered()
+
+    if pad.raw_systematics:
+        pad.systematics = tensor_processes(pad.raw_systematics.merge("quadratic"))[0]
+
+    # normalize bin heights to the bin width chosen by scale_bin_heights()
+    if pad.normalization > 0.:
+        for tensor in [data, backgrounds, signals]:
+            if tensor:
+                tensor.scale_bins(pad.normalization / tensor.widths)
+
+    if backgrounds:
+        pad.backgrounds = tensor_processes(backgrounds)
+        pad.background_sum = backgrounds.total()
+
+    if data:
+        pad.data = tensor_processes(data)[0]
+
+    if signals:
+        pad.signals = tensor_processes(signals)
+
+    pad.composed = True
+
+
+
+def create_draw_hist(process, hist = None):
+    """Converts the histogram of the process, or hist if given, into a TH1D
+    carrying the draw attributes of the process."""
+
+    draw_hist = (hist or process.hist).to_th1()
+    for setter, value in [(draw_hist.SetFillStyle,   process.fstyle),
+                          (draw_hist.SetFillColor,   process.fcolor),
+                          (draw_hist.SetLineStyle,   process.lstyle),
+                          (draw_hist.SetLineColor,   process.lcolor),
+                          (draw_hist.SetMarkerStyle, process.mstyle),
+                          (draw_hist.SetMarkerColor, process.mcolor),
+                          (draw_hist.SetMarkerSize,  process.msize)]:
+        if value is not None:
+            setter(value)
+
+    return draw_hist
 
 
 
@@ -784,10 +1182,12 @@ def compose_draw_objects():
 
     # backgrounds
     if pads[canvas.pad_nr].backgrounds:
+        for background in pads[canvas.pad_nr].backgrounds:
+            background.draw_hist = create_draw_hist(background)
 
         # create THStack
         stacked_backgrounds = Process()
-        stacked_backgrounds.hist = stack_processes(list(pads[canvas.pad_nr].backgrounds))
+        stacked_backgrounds.draw_hist = stack_processes(list(pads[canvas.pad_nr].backgrounds))
         stacked_backgrounds.label = "Stacked Backgrounds"
         stacked_backgrounds.style = "HIST"
 
@@ -795,46 +1195,47 @@ def compose_draw_objects():
             pads[canvas.pad_nr].ordered_processes.append(stacked_backgrounds)
 
     # systematics
-    if pads[canvas.pad_nr].systematics:
+    if pads[canvas.pad_nr].systematics and pads[canvas.pad_nr].backgrounds:
 
         # check if systematics should be drawn
         if settings.draw_systematics:
 
             # create systematics uncertainty band process
-            uncertainty_band = Process()
-            uncertainty_band.hist = pads[canvas.pad_nr].systematics.hist.Clone()
-            uncertainty_band.label = pads[canvas.pad_nr].systematics.label
-            uncertainty_band.style = pads[canvas.pad_nr].systematics.style
-
-            # calculate and store uncertainty band
-            stack = pads[canvas.pad_nr].ordered_processes[0].hist.GetStack().Last()
-            for i in range(1, uncertainty_band.hist.GetXaxis().GetNbins()):
-                uncertainty_band.hist.SetBinError(i, uncertainty_band.hist.GetBinContent(i) *
-                                                     stack.GetBinContent(i))
-                uncertainty_band.hist.SetBinContent(i, stack.GetBinContent(i))
+            uncertainty_band = copy.copy(pads[canvas.pad_nr].systematics)
+
+            # calculate and store uncertainty band around the background sum
+            stack = pads[canvas.pad_nr].background_sum
+            uncertainty_band.hist = uncertainty_band.hist.copy()
+            uncertainty_band.hist.sumw2 = (uncertainty_band.hist.contents * stack.contents)**2
+            uncertainty_band.hist.contents = stack.contents
 
+            uncertainty_band.draw_hist = create_draw_hist(uncertainty_band)
+            pads[canvas.pad_nr].systematics.draw_hist = uncertainty_band.draw_hist
             pads[canvas.pad_nr].ordered_processes.append(uncertainty_band)
 
     # data
     if pads[canvas.pad_nr].data:
+        pads[canvas.pad_nr].data.draw_hist = create_draw_hist(pads[canvas.pad_nr].data)
 
         # append data
         if settings.draw_data:
             # set additional error option
             if settings.chi2_quantile == 1.0:
-                pads[canvas.pad_nr].data.hist.Sumw2(False)
-                pads[canvas.pad_nr].data.hist.SetBinErrorOption(TH1.kPoisson)
+                pads[canvas.pad_nr].data.draw_hist.Sumw2(False)
+                pads[canvas.pad_nr].data.draw_hist.SetBinErrorOption(ROOT.TH1.kPoisson)
 
             pads[canvas.pad_nr].ordered_processes.append(pads[canvas.pad_nr].data)
 
     # signals
     if pads[canvas.pad_nr].signals:
+        for signal in pads[canvas.pad_nr].signals:
+            hist = signal.hist
+
+            # stack signals on top of background if required
+            if settings.stack_signal and pads[canvas.pad_nr].backgrounds:
+                hist = hist.copy().add(pads[canvas.pad_nr].background_sum)
 
-        # stack signals on top of background if required 
-        if settings.stack_signal:
-            for signal in pads[canvas.pad_nr].signals:
-                for background in pads[canvas.pad_nr].backgrounds:
-                    signal.hist.Add(background.hist)
+            signal.draw_hist = create_draw_hist(signal, hist)
 
         # insert or append signals
         if settings.draw_signal:
@@ -849,27 +1250,26 @@ def compose_draw_objects():
 
 
 
-def scale_bin_heights(base_width = 1.0):
-    """Scales the bin heights according their width relative to the 'base_width'."""
+def scale_bin_heights(base_width = 0.0):
+    """Scales the bin heights according their width relative to the 'base_width'.
+    The scaling is applied whenever the processes are merged, the scaled
+    processes are reused for redrawing until the raw processes change."""
+
+    tensors = [tensor for tensor in [pads[canvas.pad_nr].raw_data,
+                                     pads[canvas.pad_nr].raw_backgrounds,
+                                     pads[canvas.pad_nr].raw_signals] if tensor]
+    if not tensors:
+        return
 
     # use default value if no base_width is supplied
     if base_width <= 0.0:
         base_width = settings.bin_normalization_width
         # if default value is set to 0.0 (or less), use smallest bin width
         if base_width <= 0.0:
-            x_axis = get_draw_object().GetXaxis()
-            for i in range(1, x_axis.GetNbins()):
-                base_width = min(base_width, x_axis.GetBinWidth(i))
+            base_width = tensors[0].widths.min()
 
-    # scale the bin content and error
-    for process in list(itertools.chain([pads[canvas.pad_nr].data],
-                                        pads[canvas.pad_nr].backgrounds,
-                                        pads[canvas.pad_nr].signals)):
-        hist = process.hist
-        for i in range(1, hist.GetNbinsX()+1):
-            scale_factor = base_width / hist.GetBinWidth(i)
-            hist.SetBinContent(i, hist.GetBinContent(i) * scale_factor)
-            hist.SetBinError(i, hist.GetBinError(i) * scale_factor)
+    pads[canvas.pad_nr].normalization = base_width
+    pads[canvas.pad_nr].composed = False
 
 
 
@@ -878,7 +1278,7 @@ def draw():
 
     # clear pad before drawing
     cd(canvas.pad_nr + 1) # pad_nr starts at 0
-    gPad.Clear()
+    ROOT.gPad.Clear()
 
     # collect information and set up processes for drawing
     compose_draw_objects()
@@ -886,7 +1286,7 @@ def draw():
     # plot all the backgrounds
     same = ""
     for process in pads[canvas.pad_nr].ordered_processes:
-        process.hist.Draw(process.style + same)
+        process.draw_hist.Draw(process.style + same)
         same = "same"
 
     update_pad()
@@ -899,8 +1299,9 @@ def draw_processes():
     # ensure working on the right pad
     # cd(canvas.pad_nr + 1) # pad_nr starts at 0
 
-    # merge and order processes
-    order_all_processes()
+    # merge and order processes, unless they are still up to date
+    if not pads[canvas.pad_nr].composed:
+        order_all_processes()
 
     # draw
     draw()
@@ -918,10 +1319,8 @@ def ratio():
         print "There are no backgrounds."
         return
 
-    # sum up the backgrounds    
-    background_sum = pads[canvas.pad_nr].backgrounds[0].hist.Clone()
-    for i in range(1, len(pads[canvas.pad_nr].backgrounds)):
-        background_sum.Add(pads[canvas.pad_nr].backgrounds[i].hist)
+    # sum of the backgrounds
+    background_sum = pads[canvas.pad_nr].background_sum
 
     draw_object = get_draw_object()
 
@@ -931,19 +1330,19 @@ def ratio():
 
         # expand canvas
         expansion_factor = 1.25
-        canvas.canvas.SetWindowSize(850, int(floor(600 * expansion_factor)))
+        canvas.canvas.SetWindowSize(850, int(math.floor(600 * expansion_factor)))
 
         # resize drawing pad
         # base length - ( base length / expansion factor )
         y_ndc = 0.97 - (0.97 / expansion_factor)
-        gPad.SetPad(0.01, y_ndc, 0.98, 0.98)
+        ROOT.gPad.SetPad(0.01, y_ndc, 0.98, 0.98)
         update_pad()
 
         # draw new pad for ratio on canvas
         canvas.canvas.cd()
         # base length - ( drawing pad bottom margin * base length / expansion factor )
-        y_ndc = 0.97 - ((1 - gPad.GetBottomMargin()) * 0.97 / expansion_factor)
-        ratio_pad = TPad("ratiopad" + str(canvas.pad_nr), "ratiopad" + str(canvas.pad_nr),
+        y_ndc = 0.97 - ((1 - ROOT.gPad.GetBottomMargin()) * 0.97 / expansion_factor)
+        ratio_pad = ROOT.TPad("ratiopad" + str(canvas.pad_nr), "ratiopad" + str(canvas.pad_nr),
                          0.01, 0.01, 0.98, y_ndc)
 
         # adjust settings, due to different scale
@@ -956,8 +1355,8 @@ def ratio():
     pads[canvas.pad_nr].ratio.pad.cd()
 
     # calculate the ratio
-    ratio = pads[canvas.pad_nr].data.hist.Clone()
-    ratio.Divide(background_sum)
+    ratio_hist = pads[canvas.pad_nr].data.hist.copy().divide(background_sum)
+    ratio = create_draw_hist(pads[canvas.pad_nr].data, ratio_hist)
     ratio.SetMaximum(-1111)
     ratio.SetMinimum(-1111)
 
@@ -985,11 +1384,11 @@ def ratio():
 
     # systematics
     if pads[canvas.pad_nr].raw_systematics:
-        systematics = pads[canvas.pad_nr].systematics.hist.Clone()
-
-        for i in range(1, systematics.GetXaxis().GetNbins()):
-            systematics.SetBinError(i, systematics.GetBinContent(i))
-            systematics.SetBinContent(i, ratio.GetBinContent(i))
+        # relative uncertainties around the ratio
+        systematics_hist = pads[canvas.pad_nr].systematics.hist.copy()
+        systematics_hist.sumw2 = systematics_hist.contents**2
+        systematics_hist.contents = ratio_hist.contents.copy()
+        systematics = create_draw_hist(pads[canvas.pad_nr].systematics, systematics_hist)
 
         # draw if drawing enabled
         if settings.draw_systematics:
@@ -1000,11 +1399,11 @@ def ratio():
         
 
     # line
-    line = TLine(ratio.GetXaxis().GetBinLowEdge(ratio.GetXaxis().GetFirst()), 1.,
+    line = ROOT.TLine(ratio.GetXaxis().GetBinLowEdge(ratio.GetXaxis().GetFirst()), 1.,
                  ratio.GetXaxis().GetBinUpEdge(ratio.GetXaxis().GetLast()), 1.);
     line.SetLineWidth(2);
     line.SetLineStyle(2);
-    line.SetLineColor(kRed+1);
+    line.SetLineColor(ROOT.kRed+1);
     line.Draw();
     pads[canvas.pad_nr].ratio.line = line
 
@@ -1027,6 +1426,11 @@ def plot(histogram_name):
         print "No selection done yet. Use selection('insert_run_name')"
         return
 
+    # check for existing histogram, if the catalog has been loaded
+    if objects.catalog and not objects.catalog.get(settings.hist_prefix + histogram_name):
+        print "No analysis file contains histogram", histogram_name
+        return
+
     # check for existing canvas
     if canvas.canvas is None:
         create_canvas()
@@ -1038,19 +1442,139 @@ def plot(histogram_name):
 
 
 
-def save(file_name = ""):
+def plot_grid(histogram_names, divide_x = 0, divide_y = 0):
+    """Plot the histograms histogram_names into the pads of a divided canvas,
+    one histogram per pad. The histograms of all pads are read at once by
+    read_many(). Without divide_x and divide_y, the current canvas is used if
+    it has enough pads, otherwise a nearly square grid is created."""
+
+    # check for existing cfg file
+    if objects.cfg is None:
+        print "No config file loaded! Use setup('canvas.cfg')"
+        return
+
+    # check for existing selection
+    if settings.ana_dir is "":
+        print "No selection done yet. Use selection('insert_run_name')"
+        return
+
+    # check for existing histograms, if the catalog has been loaded
+    for histogram_name in histogram_names:
+        if objects.catalog and not objects.catalog.get(settings.hist_prefix + histogram_name):
+            print "No analysis file contains histogram", histogram_name
+            return
+
+    # choose the grid
+    if divide_x < 1 or divide_y < 1:
+        if canvas.canvas and canvas.max_pad_nr >= len(histogram_names):
+            divide_x = divide_y = 0
+        else:
+            divide_x = int(math.ceil(math.sqrt(len(histogram_names))))
+            divide_y = int(math.ceil(len(histogram_names) / float(divide_x)))
+    elif divide_x * divide_y < len(histogram_names):
+        print "A grid of", divide_x, "x", divide_y, "pads can not hold", len(histogram_names), "histograms."
+        return
+
+    if divide_x:
+        create_canvas(divide_x, divide_y)
+    else:
+        # clear the drawings before their objects are released
+        for pad_number in range(1, canvas.max_pad_nr + 1):
+            canvas.canvas.GetPad(pad_number).Clear()
+        clear_and_prepare_pads(canvas.max_pad_nr)
+
+    read_many(histogram_names)
+    grid_pads = pads[:len(histogram_names)]
+    for histogram_name, pad in zip(histogram_names, grid_pads):
+        read_processes(histogram_name, pad)
+    map(order_all_processes, grid_pads)
+
+    for pad_number in range(1, len(grid_pads) + 1):
+        cd(pad_number)
+        draw_processes()
+    cd(1)
+
+
+
+def save(file_name = "", formats = None):
     """Saves the current TCanvas into a file with the name file_name. By default,
-    the histogram's name is being used and saved as a '.pdf' to the subfolder 'plots'."""
+    the histogram's name is being used and saved as a '.pdf' to the subfolder 'plots'.
+    Returns the name of the written file.
+    If a list of formats like ["pdf", "png", "eps", "root"] is given, the canvas is
+    written in every format, replacing the extension of file_name, and the list of
+    the names of the written files is returned. The bitmap formats are all written
+    from a single image of the canvas.
+    While a plot book is open, see open_book(), save() without arguments appends
+    the canvas as a page to the book instead and saving PDFs is refused."""
+
+    if objects.plot_book and not file_name and formats is None:
+        objects.plot_book.add_page(canvas.canvas, get_draw_object().GetName().replace(settings.hist_prefix, ""))
+        return objects.plot_book.file_name
     
     if not file_name:
         file_name = "plots/" + get_draw_object().GetName().replace(settings.hist_prefix, "") + ".pdf"
+
+    # ROOT writes only one PDF at a time, another one would break the book
+    if formats is None:
+        extensions = [os.path.splitext(file_name)[1]]
+    else:
+        extensions = ["." + extension.lstrip(".") for extension in formats]
+    if objects.plot_book and ".pdf" in [extension.lower() for extension in extensions]:
+        print "Cannot save a PDF while the plot book", objects.plot_book.file_name, "is open. Use close_book() first."
+        return
     
     path = ("./" + file_name).rsplit("/", 1)[0]
     if not os.path.exists(path):
         os.makedirs(path)
-    canvas.canvas.SaveAs(file_name)
 
-    
+    if formats is None:
+        canvas.canvas.SaveAs(file_name)
+        objects.saved_files.append(file_name)
+        return file_name
+
+    canvas.canvas.Update()
+    base_name = os.path.splitext(file_name)[0]
+    file_names = [base_name + extension for extension in extensions]
+    image = None # image of the canvas, painted for the first bitmap format
+    for name, extension in zip(file_names, extensions):
+        if extension.lower() in (".png", ".gif", ".jpg", ".jpeg", ".tiff", ".xpm", ".bmp"):
+            if image is None:
+                image = ROOT.TImage.Create()
+                image.FromPad(canvas.canvas)
+            image.WriteImage(name)
+        else:
+            canvas.canvas.Print(name)
+    objects.saved_files.extend(file_names)
+    return file_names
+
+
+
+def open_book(file_name = "plots/book.pdf", toc = True):
+    """Opens a multi-page PDF, to which every following save() appends a page
+    until close_book() is called. With toc, a table of contents is appended
+    when closing the book and written next to it as '.toc' file."""
+
+    if objects.plot_book:
+        close_book()
+    objects.plot_book = PlotBook(file_name, toc)
+    print "Appending saved plots to", file_name
+
+
+
+def close_book():
+    """Closes the plot book opened by open_book()."""
+
+    if not objects.plot_book:
+        print "No plot book opened! Use open_book('plots/book.pdf')"
+        return
+
+    pages = objects.plot_book.close()
+    print "Wrote", pages, "pages to", objects.plot_book.file_name
+    if pages:
+        objects.saved_files.append(objects.plot_book.file_name)
+    objects.plot_book = None
+
+
 
 def remove_export_function(function_title):
     """Removes the function with the title function_title from the 'export.py' file."""
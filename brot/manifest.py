@@ -0,0 +1,71 @@
+import os
+import json
+
+from configsnapshot import file_digest
+
+
+class BuildManifest():
+    """Dependencies of the plots written by the exported functions: the
+    modification times of the analysis files read, the hashes of the config
+    files and a hash of the source of the function. A plot only has to be
+    rebuilt if one of them changed or one of its files is missing."""
+
+    def __init__(self, path):
+        self.path      = path # path of the manifest on disk
+        self.functions = {}   # function : {"source", "config", "inputs", "outputs"}
+
+    def load(self):
+        """Reads the manifest from disk, if it exists."""
+
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self.functions = json.load(f)
+
+    def save(self):
+        """Writes the manifest to disk."""
+
+        path = os.path.dirname(self.path)
+        if path and not os.path.exists(path):
+            os.makedirs(path)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.functions, f)
+        os.rename(self.path + ".tmp", self.path)
+
+    def is_stale(self, function_name, source_hash, digests):
+        """Returns whether the function function_name has to be run again. The
+        digests map the paths of the config files hashed so far to their
+        hashes, None for missing files, and are filled as needed."""
+
+        entry = self.functions.get(function_name)
+        if not entry or entry["source"] != source_hash or not isinstance(entry["config"], dict):
+            return True
+        for path, digest in entry["config"].iteritems():
+            if path not in digests:
+                digests[path] = file_digest(path) if os.path.exists(path) else None
+            if digests[path] != digest:
+                return True
+
+        for path in entry["outputs"]:
+            if not os.path.exists(path):
+                return True
+        for path, mtime in entry["inputs"].iteritems():
+            if (os.path.getmtime(path) if os.path.exists(path) else None) != mtime:
+                return True
+
+        return False
+
+    def record(self, function_name, source_hash, config, inputs, outputs):
+        """Records the dependencies of a successful run of function_name, with
+        config mapping the paths of the config files to their hashes and inputs
+        mapping the paths of the analysis files read to their modification
+        times."""
+
+        self.functions[function_name] = {"source"  : source_hash,
+                                         "config"  : config,
+                                         "inputs"  : inputs,
+                                         "outputs" : outputs}
+
+    def remove(self, function_name):
+        """Forgets the function function_name, so that it is run next time."""
+
+        self.functions.pop(function_name, None)
@@ -0,0 +1,285 @@
+#!/usr/bin/python
+
+######################################################################
+# header
+
+# Replays the functions exported to 'export.py' like replay.py, but plans the
+# replay first: the functions are parsed into sequences of operations and
+# grouped by the histogram they plot from the same analysis directory. Every
+# group is run by one worker, which reads the analysis files of its histogram
+# only once into the histogram cache. Every function of the group then runs in
+# a fork of the worker, so that it starts from the same loaded histograms and,
+# like with replay.py, from a fresh state.
+#
+# usage: python planner.py [-e export.py] [-w workers] [-n] [-o summary.json] [function ...]
+
+import os
+import ast
+import sys
+import json
+import time
+import cPickle
+import fnmatch
+import argparse
+import multiprocessing
+from collections import namedtuple, OrderedDict
+
+from lazyroot import ROOT
+
+import main
+import replay
+
+
+# call of a bROT function in an exported function, args is None if not all
+# arguments are literals
+Operation = namedtuple("Operation", ["name", "args"])
+
+# exported function with its operations and the (config file, analysis
+# directory, histogram) of every call of plot(), planned is False if the
+# config file, analysis directory or histogram can not be determined
+ExportedFunction = namedtuple("ExportedFunction", ["name", "operations", "inputs", "planned"])
+
+
+# config file and analysis directory set by brot_init()
+DEFAULT_CONFIG = "plot.cfg"
+DEFAULT_SELECTION = "pytest"
+
+
+def parse_operation(statement):
+    """Returns the Operation of a statement calling a function by its name or
+    None for any other statement."""
+
+    if not (isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Call)
+            and isinstance(statement.value.func, ast.Name)):
+        return None
+
+    call = statement.value
+    try:
+        args = tuple(ast.literal_eval(arg) for arg in call.args)
+        args += tuple((keyword.arg, ast.literal_eval(keyword.value)) for keyword in call.keywords)
+    except ValueError:
+        args = None
+    if call.starargs or call.kwargs:
+        args = None
+
+    return Operation(call.func.id, args)
+
+
+
+def parse_exports(export_file = "export.py"):
+    """Parses the functions of export_file, which can be called without
+    arguments, into ExportedFunctions in the order of their definition."""
+
+    with open(export_file, "r") as f:
+        tree = ast.parse(f.read(), export_file)
+
+    functions = []
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef) or len(node.args.args) != len(node.args.defaults):
+            continue
+
+        # follow the config file and analysis directory through the function
+        config_file, analysis_directory = DEFAULT_CONFIG, DEFAULT_SELECTION
+        operations, inputs, planned = [], [], True
+        for statement in node.body:
+            operation = parse_operation(statement)
+            if not operation:
+                planned = False
+                continue
+            operations.append(operation)
+
+            if operation.name in ["setup", "selection", "plot"]:
+                if not operation.args or not isinstance(operation.args[0], basestring):
+                    planned = False
+                elif operation.name == "setup":
+                    config_file = operation.args[0]
+                elif operation.name == "selection":
+                    analysis_directory = operation.args[0]
+                else:
+                    inputs.append((config_file, analysis_directory, operation.args[0]))
+
+        functions.append(ExportedFunction(node.name, operations, inputs, planned))
+
+    return functions
+
+
+
+def plan(functions):
+    """Groups the functions by the (config file, analysis directory, histogram)
+    of their first plot. Returns a list of (input, function names) pairs in the
+    order of the first function of every group. Functions which could not be
+    planned form a group of their own with the input None."""
+
+    groups = OrderedDict()
+    for function in functions:
+        if function.planned and function.inputs:
+            groups.setdefault(function.inputs[0], []).append(function.name)
+        else:
+            groups[(None, function.name)] = [function.name]
+
+    return [(key if key[0] else None, function_names) for key, function_names in groups.iteritems()]
+
+
+
+def reset_worker(config_file = DEFAULT_CONFIG, analysis_directory = DEFAULT_SELECTION):
+    """Brings the worker back to the given config file and analysis directory
+    and to a fresh canvas, keeping the histogram cache."""
+
+    if os.path.basename(main.objects.cfg.filename) != config_file:
+        main.setup(config_file)
+        if main.settings.loader == "process":
+            main.settings.loader = "serial"
+    if main.settings.ana_dir != analysis_directory:
+        main.selection(analysis_directory)
+    main.create_canvas()
+
+
+
+def fork_job(function_name):
+    """Runs replay_job() of function_name in a forked child process, which
+    starts from the state and histogram cache of the worker and leaves both
+    untouched. Returns the result of replay_job() and the file reads of the
+    function."""
+
+    read_end, write_end = os.pipe()
+    sys.stdout.flush()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        try:
+            result = replay.replay_job(function_name)
+            with os.fdopen(write_end, "wb") as f:
+                cPickle.dump((result, main.objects.file_reads), f, cPickle.HIGHEST_PROTOCOL)
+        finally:
+            sys.stdout.flush()
+            os._exit(0)
+
+    os.close(write_end)
+    reads = main.objects.file_reads
+    with os.fdopen(read_end, "rb") as f:
+        output = f.read()
+    os.waitpid(pid, 0)
+
+    if not output:
+        return (function_name, False, 0., [], "process of the function died", None), 0
+    result, child_reads = cPickle.loads(output)
+    return result, child_reads - reads
+
+
+
+def plan_job(group):
+    """Runs the functions of a group after reading their shared histogram once,
+    each function in a fork of the worker. Returns a tuple of (input, results
+    of replay_job(), file reads of the shared histogram, file reads of the
+    functions)."""
+
+    key, function_names = group
+
+    shared_reads = 0
+    if key:
+        config_file, analysis_directory, histogram_name = key
+        reset_worker(config_file, analysis_directory)
+        reads = main.objects.file_reads
+        main.read_many([histogram_name])
+        shared_reads = main.objects.file_reads - reads
+    reset_worker()
+
+    results, function_reads = [], 0
+    for function_name in function_names:
+        result, reads = fork_job(function_name)
+        results.append(result)
+        function_reads += reads
+
+    return (key, results, shared_reads, function_reads)
+
+
+
+def print_plan(groups):
+    """Prints the groups of functions of the plan."""
+
+    for key, function_names in groups:
+        if key:
+            print "{0} / {1} / {2}: {3}".format(key[0], key[1], key[2], ", ".join(function_names))
+        else:
+            print "unplanned:", ", ".join(function_names)
+
+
+
+def run_plan(groups, export_file = "export.py", workers = 4):
+    """Runs the planned groups of functions on a pool of worker processes and
+    prints the summary together with an estimate of the file reads saved by
+    the plan."""
+
+    function_names = [function_name for key, names in groups for function_name in names]
+    print "Replaying", len(function_names), "functions in", len(groups), "groups with", workers, "workers ..."
+
+    results = {}
+    planned_reads, unplanned_reads = 0, 0
+    start = time.time()
+    pool = multiprocessing.Pool(workers, replay.init_replay_worker, (export_file,))
+    try:
+        for key, group_results, shared_reads, function_reads in pool.imap_unordered(plan_job, groups):
+            for result in group_results:
+                results[result[0]] = replay.print_result(*result)
+            # estimate: without the plan, every function would have read the
+            # shared histogram itself
+            planned_reads += shared_reads + function_reads
+            unplanned_reads += shared_reads * len(group_results) + function_reads
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    summary = replay.print_summary(results, function_names, time.time() - start)
+    print "Read {0} files instead of an estimated {1} without the plan ({2:.1f}% fewer reads)".format(
+        planned_reads, unplanned_reads,
+        100. * (unplanned_reads - planned_reads) / unplanned_reads if unplanned_reads else 0.)
+
+    return summary
+
+
+
+def main_planner():
+    parser = argparse.ArgumentParser(description = "Replay the exported functions, reading every histogram only once.")
+    parser.add_argument("functions", nargs = "*",
+                        help = "shell-style patterns of the functions, by default all functions")
+    parser.add_argument("-e", "--export", default = "export.py", help = "file of the exported functions")
+    parser.add_argument("-w", "--workers", type = int, default = 0,
+                        help = "number of worker processes, by default the number of cores")
+    parser.add_argument("-n", "--dry-run", action = "store_true", help = "only print the plan")
+    parser.add_argument("-o", "--output", default = "", help = "write the summary as JSON to this file")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.export):
+        print "Could not find file", args.export
+        return 1
+
+    functions = parse_exports(args.export)
+    if args.functions:
+        functions = [function for function in functions
+                     if any(fnmatch.fnmatch(function.name, pattern) for pattern in args.functions)]
+    if not functions:
+        print "No functions to replay."
+        return 1
+
+    groups = plan(functions)
+    print_plan(groups)
+    if args.dry_run:
+        return 0
+
+    ROOT.gROOT.SetBatch(True)
+    workers = args.workers if args.workers > 0 else multiprocessing.cpu_count()
+    summary = run_plan(groups, args.export, min(workers, len(groups)))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent = 2)
+        print "Summary written to", args.output
+
+    return 0 if all(result["success"] for result in summary) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_planner())
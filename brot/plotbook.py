@@ -0,0 +1,78 @@
+import os
+from lazyroot import ROOT
+
+
+class PlotBook():
+    """Multi-page PDF which is kept open while plots are appended to it as
+    pages, using ROOT's 'name.pdf(' and 'name.pdf]' paging. Every page gets an
+    entry in the outline of the PDF and, optionally, the book ends with a
+    table of contents mapping the titles of the pages to their numbers. ROOT
+    keeps only one PDF open, so no other PDF may be printed until the book is
+    closed."""
+
+    entries_per_page = 40 # lines of the table of contents per page
+
+    def __init__(self, file_name, toc = True):
+        self.file_name = file_name # path of the PDF
+        self.toc       = toc       # append a table of contents when closing
+        self.pages     = []        # titles of the pages in order
+        self.canvas    = None      # canvas of the last page, used to close the book
+        self.misc      = []        # drawing objects of the table of contents
+
+    def add_page(self, canvas, title):
+        """Appends the canvas as a page with the given title to the book and
+        returns its page number. The book is opened with the first page."""
+
+        if not self.pages:
+            path = os.path.dirname(self.file_name)
+            if path and not os.path.exists(path):
+                os.makedirs(path)
+            canvas.Print(self.file_name + "(", "Title:" + title)
+        else:
+            canvas.Print(self.file_name, "Title:" + title)
+
+        self.canvas = canvas
+        self.pages.append(title)
+        return len(self.pages)
+
+    def add_toc(self):
+        """Appends the table of contents as pages to the book."""
+
+        entries = [(number + 1, title) for number, title in enumerate(self.pages)]
+        toc_canvas = ROOT.TCanvas("bookToc", "Contents", 850, 600)
+        for start in range(0, len(entries), self.entries_per_page):
+            toc_canvas.Clear()
+            latex = ROOT.TLatex()
+            latex.SetNDC()
+            latex.SetTextFont(42)
+            latex.SetTextSize(0.02)
+            latex.DrawLatex(0.1, 0.94, "#bf{Contents}")
+            for line, (number, title) in enumerate(entries[start : start + self.entries_per_page]):
+                y = 0.9 - line * 0.8 / self.entries_per_page
+                latex.DrawText(0.1, y, title)
+                latex.DrawText(0.85, y, str(number))
+            self.misc.append(latex)
+            toc_canvas.Print(self.file_name, "Title:Contents")
+
+        self.canvas = toc_canvas
+
+    def write_toc(self):
+        """Writes the table of contents as text file next to the book."""
+
+        with open(os.path.splitext(self.file_name)[0] + ".toc", "w") as f:
+            for number, title in enumerate(self.pages):
+                f.write("{0:5d}  {1}\n".format(number + 1, title))
+
+    def close(self):
+        """Appends the table of contents, if requested, and closes the book.
+        Returns the number of plot pages."""
+
+        if not self.pages:
+            return 0
+
+        if self.toc:
+            self.add_toc()
+            self.write_toc()
+        self.canvas.Print(self.file_name + "]")
+        self.misc = []
+        return len(self.pages)
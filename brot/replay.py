@@ -0,0 +1,244 @@
+#!/usr/bin/python
+
+######################################################################
+# header
+
+# Replays the functions exported to 'export.py' without a display. Every
+# function runs in a fresh worker process of a pool, so that functions do not
+# share canvases or settings, and the outcome of all of them is summarized.
+# With --rebuild, only the functions whose plots are out of date are replayed.
+#
+# usage: python replay.py [-e export.py] [-w workers] [-r] [-o summary.json] [function ...]
+
+import os
+import ast
+import sys
+import json
+import time
+import hashlib
+import fnmatch
+import argparse
+import traceback
+import multiprocessing
+
+from lazyroot import ROOT
+
+import main
+import style
+from manifest import BuildManifest
+from lazyexport import function_sources
+
+
+# namespace of the exported functions in a worker process
+namespace = {}
+
+
+def exported_functions(export_file = "export.py"):
+    """Returns the names of the functions defined in export_file, which can be
+    called without arguments, in the order of their definition."""
+
+    with open(export_file, "r") as f:
+        tree = ast.parse(f.read(), export_file)
+
+    return [node.name for node in tree.body
+            if isinstance(node, ast.FunctionDef) and len(node.args.args) == len(node.args.defaults)]
+
+
+
+def init_replay_worker(export_file):
+    """Sets up bROT in a worker process like brot.py does, drawing in ROOT batch
+    mode, and loads the exported functions into the namespace of main.py."""
+
+    ROOT.gROOT.SetBatch(True)
+    style.set_tdr_style()
+    main.setup("plot.cfg")
+    main.selection("pytest")
+
+    # workers of a pool can not start a pool of their own
+    if main.settings.loader == "process":
+        main.settings.loader = "serial"
+    main.init_loader_process()
+
+    namespace.update(vars(main))
+    with open(export_file, "r") as f:
+        code = compile(f.read() + "\n", export_file, "exec")
+    ROOT.add_names(code, namespace) # bare ROOT names, as export.py is written from the history
+    exec code in namespace
+
+
+
+def replay_job(function_name):
+    """Calls the exported function function_name and saves its plot, unless the
+    function saves it by itself. Returns a tuple of (function_name, success,
+    wall time in s, output paths, error message, dependencies), see
+    replay_dependencies() for the latter."""
+
+    main.objects.saved_files = []
+    main.objects.read_files = set()
+    start = time.time()
+    try:
+        namespace[function_name]()
+        if not main.objects.saved_files and main.canvas.canvas and main.get_draw_object():
+            main.save()
+    except Exception:
+        return (function_name, False, time.time() - start, list(main.objects.saved_files),
+                traceback.format_exc(), None)
+
+    if not main.objects.saved_files:
+        return (function_name, False, time.time() - start, [], "nothing to draw", None)
+    return (function_name, True, time.time() - start, list(main.objects.saved_files), "",
+            replay_dependencies())
+
+
+
+def replay_dependencies():
+    """Returns the dependencies of the last replayed function as a dictionary
+    with the hashes of the config files, see main.config_digests(), and the
+    modification times of the analysis files read, None for missing files."""
+
+    return {"config" : main.config_digests(),
+            "inputs" : dict((path, os.path.getmtime(path) if os.path.exists(path) else None)
+                            for path in main.objects.read_files)}
+
+
+
+def print_result(function_name, success, wall_time, paths, error, dependencies = None):
+    """Prints the outcome of a replayed function and returns it as dictionary."""
+
+    print "{0:40} {1:8.2f} s  {2}".format(function_name, wall_time, " ".join(paths) if success else "failed")
+    return {"function"     : function_name,
+            "success"      : success,
+            "wall_time"    : wall_time,
+            "paths"        : paths,
+            "error"        : error,
+            "dependencies" : dependencies}
+
+
+
+def print_summary(results, function_names, wall_time):
+    """Prints the summary of the replayed functions and returns their results
+    in the order of function_names."""
+
+    summary = [results[function_name] for function_name in function_names if function_name in results]
+    failed = [result for result in summary if not result["success"]]
+    print "Replayed {0} of {1} functions in {2:.2f} s, {3} failed, {4:.2f} s of work".format(
+        len(summary) - len(failed), len(function_names), wall_time, len(failed),
+        sum(result["wall_time"] for result in summary))
+    for result in failed:
+        print "Failed", result["function"] + ":"
+        print result["error"]
+
+    return summary
+
+
+
+def run_replay(function_names, export_file = "export.py", workers = 4):
+    """Replays the exported functions function_names on a pool of worker
+    processes, each process running a single function. Prints and returns the
+    summary as a list of dictionaries in the order of function_names."""
+
+    print "Replaying", len(function_names), "functions with", workers, "workers ..."
+
+    results = {}
+    start = time.time()
+    pool = multiprocessing.Pool(workers, init_replay_worker, (export_file,), maxtasksperchild = 1)
+    try:
+        for result in pool.imap_unordered(replay_job, function_names):
+            results[result[0]] = print_result(*result)
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    return print_summary(results, function_names, time.time() - start)
+
+
+
+def load_manifest(export_file = "export.py"):
+    """Returns the build manifest of the functions in export_file, stored in the
+    cache directory of the current config."""
+
+    manifest = BuildManifest(main.settings.cache_dir + "manifest/" +
+                             hashlib.md5(os.path.realpath(export_file)).hexdigest() + ".json")
+    manifest.load()
+    return manifest
+
+
+
+def stale_functions(manifest, function_names, sources):
+    """Returns those of the functions function_names, which have to be replayed
+    because their source, config or analysis files changed since their last
+    replay or because one of their plots is missing."""
+
+    digests = {} # hash every config file only once
+    return [function_name for function_name in function_names
+            if manifest.is_stale(function_name, hashlib.md5(sources[function_name]).hexdigest(), digests)]
+
+
+
+def update_manifest(manifest, summary, sources):
+    """Records the dependencies of the successfully replayed functions and
+    forgets the failed ones."""
+
+    for result in summary:
+        if result["success"]:
+            dependencies = result["dependencies"]
+            manifest.record(result["function"], hashlib.md5(sources[result["function"]]).hexdigest(),
+                            dependencies["config"], dependencies["inputs"], result["paths"])
+        else:
+            manifest.remove(result["function"])
+    manifest.save()
+
+
+
+def main_replay():
+    parser = argparse.ArgumentParser(description = "Replay the exported functions in ROOT batch mode with several workers.")
+    parser.add_argument("functions", nargs = "*",
+                        help = "shell-style patterns of the functions, by default all functions")
+    parser.add_argument("-e", "--export", default = "export.py", help = "file of the exported functions")
+    parser.add_argument("-w", "--workers", type = int, default = 0,
+                        help = "number of worker processes, by default the number of cores")
+    parser.add_argument("-r", "--rebuild", action = "store_true",
+                        help = "only replay the functions whose plots are out of date")
+    parser.add_argument("-o", "--output", default = "", help = "write the summary as JSON to this file")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.export):
+        print "Could not find file", args.export
+        return 1
+
+    function_names = exported_functions(args.export)
+    if args.functions:
+        function_names = [name for name in function_names
+                          if any(fnmatch.fnmatch(name, pattern) for pattern in args.functions)]
+    if not function_names:
+        print "No functions to replay."
+        return 1
+
+    ROOT.gROOT.SetBatch(True)
+    main.setup("plot.cfg")
+    sources = function_sources(args.export)
+    manifest = load_manifest(args.export)
+    if args.rebuild:
+        stale = stale_functions(manifest, function_names, sources)
+        print "Skipping", len(function_names) - len(stale), "up to date functions."
+        if not stale:
+            return 0
+        function_names = stale
+
+    workers = args.workers if args.workers > 0 else multiprocessing.cpu_count()
+    summary = run_replay(function_names, args.export, min(workers, len(function_names)))
+    update_manifest(manifest, summary, sources)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent = 2)
+        print "Summary written to", args.output
+
+    return 0 if all(result["success"] for result in summary) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_replay())
@@ -1,8 +1,9 @@
-from ROOT import gStyle
+from lazyroot import ROOT
 
 def set_tdr_style():
     """Recommended plotting parameters are being set."""
 
+    gStyle = ROOT.gStyle
     print "Using the TDR plotting style."
     # canvas
     gStyle.SetCanvasBorderMode(0)
@@ -0,0 +1,104 @@
+import os
+import json
+
+from configsnapshot import file_digest
+from lib.configobj import ConfigObj
+
+
+def scan_sections(xs_path):
+    """Returns the byte offsets of the top level sections of the cross section
+    file at xs_path as a dictionary name : [start, end] and the sorted names of
+    sections occurring more than once. A section reaches up to the next one,
+    anything before the first section is stored as ""."""
+
+    sections, duplicates = {}, set()
+    name, start, offset = "", 0, 0
+    with open(xs_path, "rb") as f:
+        for line in f:
+            mat = line.lstrip()[:1] == "[" and ConfigObj._sectionmarker.match(line.rstrip("\r\n"))
+            if mat and mat.group(2).count("[") == 1:
+                if name in sections:
+                    duplicates.add(name)
+                sections.setdefault(name, [start, offset])
+                name, start = mat.group(3), offset
+                if len(name) > 1 and name[0] == name[-1] and name[0] in "\"'":
+                    name = name[1:-1]
+            offset += len(line)
+
+    if name in sections:
+        duplicates.add(name)
+    sections.setdefault(name, [start, offset])
+    return sections, sorted(duplicates)
+
+
+
+class XSIndex():
+    """Index of the byte offsets of the sections in a cross section file, so
+    that only the sections of the samples in use are read and parsed. The index
+    is stored on disk and rebuilt whenever the contents of the file change.
+    Sections occurring more than once are left to the full parser, which
+    reports them."""
+
+    def __init__(self, xs_path, index_path):
+        self.xs_path    = xs_path    # path of the cross section file
+        self.index_path = index_path # path of the index on disk
+        self.signature  = None       # [mtime, md5] of the indexed file
+        self.sections   = {}         # name : [start, end] byte offsets in the file
+        self.duplicates = []         # names of the sections occurring more than once
+
+    def load(self):
+        """Reads the index from disk and rebuilds it, if the file changed since
+        it was made. Returns whether the index was rebuilt."""
+
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r") as f:
+                    index = json.load(f)
+                self.signature, self.sections, self.duplicates = (index["signature"], index["sections"],
+                                                                  index["duplicates"])
+            except (ValueError, KeyError):
+                self.signature, self.sections, self.duplicates = None, {}, []
+
+        mtime = os.path.getmtime(self.xs_path)
+        if self.signature and self.signature[0] == mtime:
+            return False
+
+        digest = file_digest(self.xs_path)
+        if self.signature and self.signature[1] == digest:
+            # touched without changing its contents
+            self.signature[0] = mtime
+            self.save()
+            return False
+
+        self.signature = [mtime, digest]
+        self.sections, self.duplicates = scan_sections(self.xs_path)
+        self.save()
+        return True
+
+    def save(self):
+        """Writes the index to disk."""
+
+        path = os.path.dirname(self.index_path)
+        if path and not os.path.exists(path):
+            os.makedirs(path)
+        with open(self.index_path, "w") as f:
+            json.dump({"signature" : self.signature, "sections" : self.sections,
+                       "duplicates" : self.duplicates}, f)
+
+    def read(self, names):
+        """Returns a ConfigObj holding only the sections of the given names in
+        the order of the file. Names without a section are left out. If any of
+        them occurs more than once, the whole file is parsed instead, so that
+        the parser raises its error."""
+
+        if set(names) & set(self.duplicates):
+            return ConfigObj(self.xs_path)
+
+        spans = sorted(self.sections[name] for name in set(names) | set([""]) if name in self.sections)
+        chunks = []
+        with open(self.xs_path, "rb") as f:
+            for start, end in spans:
+                f.seek(start)
+                chunks.append(f.read(end - start))
+
+        return ConfigObj("".join(chunks).splitlines())